@@ -29,7 +29,8 @@
 #  \attention You should use <tt>UTF-8</tt> as default encoding because Greek 
 #  letters represent some physical quantities, units, and dimensions. However, 
 #  you will still be able to use this library if you have another default encoding. 
-#  The symbols will then not print correctly.
+#  The symbols will then not print correctly. Call 
+#  <tt>scuq.si.check_encoding()</tt> to get a warning in that case.
 #  \attention In this documentation the term <tt>integer</tt> refers to
 #             they Python type <tt>int</tt> as well as <tt>long</tt>. This
 #             library casts all <tt>int</tt> arguments to <tt>long</tt> 
@@ -21,6 +21,7 @@
 # standard module
 import operator
 import numpy
+import types
 
 def gcd( m, n ):
     """! @brief Calculate the greatest common divisor.
@@ -35,10 +36,10 @@ def gcd( m, n ):
     m = long( m )
     n = long( n )
     
-    if( n == 0L ):
-        return m
-    else:
-        return gcd( n, m % n )
+    # Euclidean algorithm
+    while( n != 0L ):
+        m, n = n, m % n
+    return m
 
 def rational( n, d ):
     """! @brief       This function provides an interface for rational numbers
@@ -70,6 +71,13 @@ class RationalNumber:
       @see RationalNumber.__float__
     """
     
+    ## Greatest common divisors of recurring dividends and divisors, 
+    # see RationalNumber.normalize.
+    __GCD_CACHE = {}
+    
+    ## Maximum number of entries of the cache.
+    __CACHE_SIZE = 1024
+    
     def __init__( self, dividend, divisor=1L ):
         """! @brief Default constructor.
         
@@ -92,6 +100,23 @@ class RationalNumber:
         self.__dividend__ = long( dividend )
         self.normalize()
         
+    def __make( dividend, divisor ):
+        """! @brief Helper method to create a rational number that is 
+              already in its canonical form.
+              
+              The instance is created together with its attributes, the 
+              constructor is not called. Thus, the arguments are neither
+              checked nor normalized.
+              @param dividend A long integer.
+              @param divisor A positive long integer, having no common 
+                     divisor with the dividend.
+              @return A new rational number.
+        """
+        return types.InstanceType( RationalNumber, 
+                                   { "__dividend__" : dividend, 
+                                     "__divisor__"  : divisor } )
+    __make = staticmethod( __make )
+    
     def __str__( self ):
         """! @brief This method returns a string representing this rational number.
               @param self
@@ -110,7 +135,18 @@ class RationalNumber:
         if( self.__divisor__ < 0 ):
             self.__dividend__ = - self.__dividend__
             self.__divisor__  = - self.__divisor__
-        mygcd = gcd( abs( self.__dividend__ ), self.__divisor__ )
+        # integers are always normalized
+        if( self.__divisor__ == 1L ):
+            return
+        
+        key   = ( abs( self.__dividend__ ), self.__divisor__ )
+        mygcd = RationalNumber.__GCD_CACHE.get( key )
+        if( mygcd is None ):
+            mygcd = gcd( key[0], key[1] )
+            if( len( RationalNumber.__GCD_CACHE ) >= 
+                RationalNumber.__CACHE_SIZE ):
+                RationalNumber.__GCD_CACHE.clear()
+            RationalNumber.__GCD_CACHE[key] = mygcd
         self.__dividend__ = self.__dividend__ / mygcd
         self.__divisor__  = self.__divisor__ / mygcd
         
@@ -156,6 +192,11 @@ class RationalNumber:
         """
         assert( isinstance( value, RationalNumber ) )
         
+        # the sum of integers needs no normalization
+        if( self.__divisor__ == 1L and value.__divisor__ == 1L ):
+            return RationalNumber.__make( self.__dividend__ + 
+                                          value.__dividend__, 1L )
+        
         selfDividend  = self.__dividend__ * value.__divisor__
         otherDividend = value.__dividend__ * self.__divisor__
         newDivisor    = self.__divisor__ * value.__divisor__
@@ -170,6 +211,11 @@ class RationalNumber:
         """
         assert( isinstance( value, RationalNumber ) )
         
+        # the difference of integers needs no normalization
+        if( self.__divisor__ == 1L and value.__divisor__ == 1L ):
+            return RationalNumber.__make( self.__dividend__ - 
+                                          value.__dividend__, 1L )
+        
         selfDividend  = self.__dividend__ * value.__divisor__
         otherDividend = value.__dividend__ * self.__divisor__
         newDivisor    = self.__divisor__ * value.__divisor__
@@ -184,6 +230,11 @@ class RationalNumber:
         """
         assert( isinstance( value, RationalNumber ) )
         
+        # the product of integers needs no normalization
+        if( self.__divisor__ == 1L and value.__divisor__ == 1L ):
+            return RationalNumber.__make( self.__dividend__ * 
+                                          value.__dividend__, 1L )
+        
         newDividend   = self.__dividend__ * value.__dividend__
         newDivisor    = self.__divisor__ * value.__divisor__
         return RationalNumber( newDividend, newDivisor )
@@ -243,14 +294,14 @@ class RationalNumber:
               @param self
               @return A new rational number.
         """
-        return RationalNumber( -self.__dividend__, self.__divisor__ )
+        return RationalNumber.__make( -self.__dividend__, self.__divisor__ )
     
     def __pos__( self ):
         """! @brief This method returns a copy of this instance.
               @param self
               @return A new rational number.
         """
-        return RationalNumber( self.__dividend__, self.__divisor__ )
+        return RationalNumber.__make( self.__dividend__, self.__divisor__ )
     
     def __abs__( self ):
         """! @brief This method returns the absolute value of this instance.
@@ -267,7 +318,13 @@ class RationalNumber:
               @param self
               @return A new rational number.
         """
-        return RationalNumber( self.__divisor__, self.__dividend__ )
+        if( self.__dividend__ == 0L ):
+            raise ArithmeticError( "Divide by zero" )
+        # swapping keeps the canonical form, except for the sign
+        if( self.__dividend__ < 0L ):
+            return RationalNumber.__make( -self.__divisor__, 
+                                          -self.__dividend__ )
+        return RationalNumber.__make( self.__divisor__, self.__dividend__ )
     
     def get_dividend( self ):
         """! @brief Returns the dividend of this instance.
@@ -299,6 +356,17 @@ class RationalNumber:
         return self.__divisor__ == value.__divisor__ \
            and self.__dividend__ == value.__dividend__
 
+    def __hash__( self ):
+        """! @brief Get the hash value of this instance.
+              The hash value is consistent with the comparison to integers
+              and floating point numbers.
+              @param self
+              @return The hash value of this rational number.
+        """
+        if( self.__divisor__ == 1L ):
+            return hash( self.__dividend__ )
+        return hash( float( self ) )
+
     def __lt__( self, value ):
         """! @brief Checks if this instance is less than another number.
               @param self
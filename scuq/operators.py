@@ -17,36 +17,159 @@
 # @{
 
 # standard modules
+import math
 import numpy
 import operator
 import pickle
+import weakref
 
 # local modules
 import arithmetic
 
+## Functions used by the conversions, bound once to save the attribute
+#  lookups on their modules.
+_ndarray = numpy.ndarray
+_numpy_add = numpy.add
+_numpy_multiply = numpy.multiply
+_numpy_log = numpy.log
+_numpy_exp = numpy.exp
+_math_log = math.log
+_math_exp = math.exp
+_float64 = numpy.float64
 
-class UnitOperator:
+def _scalar_log( value ):
+    """! @brief Compute the natural logarithm of a scalar.
+          
+          The math module is used, but numpy is used for values the math 
+          module rejects, so that e.g. -inf and nan are returned for 0 and
+          negative values. The result is a numpy.float64, like the result 
+          of numpy.
+          @param value A floating point number.
+          @return The natural logarithm of the value.
+    """
+    try:
+        return _float64( _math_log( value ) )
+    except ( ValueError, OverflowError ):
+        return _numpy_log( value )
+
+def _scalar_exp( value ):
+    """! @brief Compute the exponential function of a scalar.
+          
+          The math module is used, but numpy is used if the result 
+          overflows, so that inf is returned. The result is a 
+          numpy.float64, like the result of numpy.
+          @param value A floating point number.
+          @return The exponential function of the value.
+    """
+    try:
+        return _float64( _math_exp( value ) )
+    except ( ValueError, OverflowError ):
+        return _numpy_exp( value )
+
+
+class UnitOperator( object ):
     """! @brief       Basic abstract Operator to use on units.
        @attention This class is intended to be abstract. You
                   have to use one of its silblings get any effect.
+       @note Operators are immutable. Silblings that define a weak
+             dictionary <tt>__instances__</tt> create only one instance
+             for equal constructor arguments.
     """
     
+    ## Attributes of the instances, operators do not need a dictionary.
+    __slots__ = ( "__key__", "__string__", "__weakref__" )
+    
+    def __new__( cls, *args ):
+        """! @brief Create a new operator or reuse an existing one.
+              
+              If the class keeps track of its instances (i.e. it defines
+              <tt>__instances__</tt>), an existing instance that has been
+              created using the same arguments is returned.
+              @param cls The class to instantiate.
+              @param args The arguments passed to the constructor.
+              @return An instance of the class.
+        """
+        instances = cls.__dict__.get( "__instances__" )
+        if( instances is None or len( args ) == 0 ):
+            return object.__new__( cls )
+        
+        key = tuple( [UnitOperator.__instanceKey( arg ) for arg in args] )
+        try:
+            instance = instances.get( key )
+        except TypeError:
+            # unhashable arguments are not cached
+            return object.__new__( cls )
+        if( instance is None ):
+            instance = object.__new__( cls )
+            instances[key] = instance
+        return instance
+    
+    def __instanceKey( value ):
+        """! @brief Helper method to get the key of a constructor argument.
+              The type of the argument is part of the key, so that
+              operators using an integer and a floating point value are
+              distinguished.
+              @param value A constructor argument.
+              @return The key identifying the argument.
+        """
+        return ( value.__class__, value )
+    __instanceKey = staticmethod( __instanceKey )
+    
     def __mul__( self, otherOperator ):
         """! @brief Perform the current operation on another operator.
              
               Another operation @f$g(x)@f$ will be performed on this
               operator @f$f(x)@f$. So that the new Operator is 
               @f$f \times g = g(f(x))@f$.
+              The operators meeting at the boundary of both operators
+              are simplified. Inverse operations cancel out and 
+              adjacent operations of the same kind are merged.
               @param self
               @param otherOperator The other operator to concat.
               @return The resulting operator.
         """
         assert( isinstance( otherOperator, UnitOperator ) )
-        if ( otherOperator == IDENTITY ):
+        # IDENTITY is the common case, further instances of Identity 
+        # may stem from deserialization
+        if( otherOperator is IDENTITY or \
+            isinstance( otherOperator, Identity ) ):
             return self
-        if ( self == IDENTITY ):
+        if( self is IDENTITY or isinstance( self, Identity ) ):
             return otherOperator
-        return CompoundOperator( otherOperator, self )
+        
+        inner = otherOperator.get_operators()
+        outer = self.get_operators()
+        if( len( inner ) == 1 and len( outer ) == 1 ):
+            # two elementary operators, check if they cancel out
+            if( otherOperator == ~self ):
+                return IDENTITY
+            return CompoundOperator( otherOperator, self )
+        
+        # simplify the elementary operators where both operators meet
+        while( len( inner ) > 0 and len( outer ) > 0 ):
+            joint = outer[0] * inner[-1]
+            if( isinstance( joint, CompoundOperator ) ):
+                break
+            inner = inner[:-1]
+            outer = outer[1:]
+            if( joint is not IDENTITY ):
+                outer = [joint] + outer
+        
+        operators = inner + outer
+        if( len( operators ) == 0 ):
+            return IDENTITY
+        if( len( operators ) == 1 ):
+            return operators[0]
+        return CompoundOperator( *operators )
+    
+    def get_operators( self ):
+        """! @brief Get the elementary operators forming this operator.
+              @param self
+              @return A list of the operators in the order they are 
+                      performed. For elementary operators this list
+                      contains only this operator.
+        """
+        return [self]
     
     
     def __invert__( self ):
@@ -77,7 +200,7 @@ class UnitOperator:
         raise NotImplementedError
 
     
-    def convert( self, value ):
+    def convert( self, value, out=None ):
         """! @brief Convert a value.
               
               This method performs the desired operation on an
@@ -87,12 +210,77 @@ class UnitOperator:
                          to get an effect.
               @param self
               @param value The value to convert.
+              @param out An optional array the converted array may be
+                         written to (the result is returned anyway).
               @return The converted value
         """
         raise NotImplementedError
     
     def __str__( self ):
         """! @brief Represent this operation by a string.
+              
+              Operators are immutable, hence the string is computed
+              once by _compute_str and cached afterwards.
+              @param self
+              @return A string describing this operation.
+        """
+        try:
+            return self.__string__
+        except AttributeError:
+            self.__string__ = self._compute_str()
+            return self.__string__
+    
+    def __repr__( self ):
+        """! @brief Represent this operator for debugging purposes.
+              @param self
+              @return A string containing the class and the operation.
+        """
+        return "<"+self.__class__.__name__+" "+str( self )+">"
+    
+    def _emit_expr( self, var, constants ):
+        """! @brief Emit the source code of an expression performing
+              this operation.
+              
+              This method is used by CompoundOperator in order to compile
+              its operators into a single function. The default 
+              implementation calls UnitOperator.convert.
+              @param self
+              @param var The source code of the expression to convert.
+              @param constants A list of objects referenced by the
+                               expression, <tt>_c0</tt>, <tt>_c1</tt>, ...
+                               refer to its elements. Further objects
+                               are appended.
+              @return The source code of the expression.
+        """
+        return "_c%d.convert(%s)" % ( UnitOperator._constant( constants, 
+                                                              self ), 
+                                      var )
+    
+    def _constant( constants, value ):
+        """! @brief Helper method to reference a constant in emitted code.
+              @param constants A list of objects referenced by an 
+                               expression.
+              @param value The object to reference.
+              @return The index of the value in the list of constants.
+        """
+        constants.append( value )
+        return len( constants ) - 1
+    _constant = staticmethod( _constant )
+    
+    def _state_tuple( state ):
+        """! @brief Helper method to get the state of an operator as tuple.
+              Operators pickled by earlier versions of this module have
+              a single value as state, instead of a 1-tuple.
+              @param state The state passed to __setstate__.
+              @return The state as a tuple.
+        """
+        if( isinstance( state, tuple ) ):
+            return state
+        return ( state, )
+    _state_tuple = staticmethod( _state_tuple )
+    
+    def _compute_str( self ):
+        """! @brief Build the string representing this operation.
               @attention This method is intended to be abstract. The 
                          silblings of this class override it in order
                          to get an effect.
@@ -104,7 +292,7 @@ class UnitOperator:
     def __getstate__( self ):
         """! @brief Abstract method: Serialization using pickle.
               @param self
-              @return A string that represents the serialized form
+              @return A tuple that represents the serialized form
                       of this instance.
         """
         raise NotImplementedError
@@ -118,13 +306,31 @@ class UnitOperator:
     
     def __eq__( self, other ):
         """! @brief Test for equality.
+              
+              Two operators are equal if their keys are equal. The
+              silblings of this class assign the key 
+              <tt>__key__</tt>, a tuple of their class and their
+              parameters, when they are initialized.
               @param self
               @param other Another UnitOperator.
         """
-        # global test for IDENTITY
-        if( ( self is IDENTITY ) and ( other is IDENTITY ) ):
+        if( other is self ):
             return True
-        return False
+        return self.__key__ == getattr( other, "__key__", None )
+    
+    def __ne__( self, other ):
+        """! @brief Test for inequality.
+              @param self
+              @param other Another UnitOperator.
+        """
+        return not self.__eq__( other )
+    
+    def __hash__( self ):
+        """! @brief Get the hash value of this operator.
+              @param self
+              @return The hash value of the key of this operator.
+        """
+        return hash( self.__key__ )
     
 
 class __ExpOperator__( UnitOperator ):
@@ -133,7 +339,13 @@ class __ExpOperator__( UnitOperator ):
       @note Instances of this class can be serialized using pickle.
     """
     
-    def __init__( self, exponent ):
+    ## Attributes of the instances.
+    __slots__ = ( "__exponent__", "__logExponent__" )
+    
+    ## Instances of this class, indexed by their constructor arguments.
+    __instances__ = weakref.WeakValueDictionary()
+    
+    def __init__( self, exponent=None ):
         """! @brief Default constructor.
              
               Initializes the operator and assigns the base to the
@@ -141,9 +353,16 @@ class __ExpOperator__( UnitOperator ):
               @param self
               @param exponent the exponent.
         """
+        # unpickled instance, the state is set by __setstate__
+        if( exponent is None ):
+            return
         assert( operator.isNumberType( exponent ) )
+        # reused instance, see UnitOperator.__new__
+        if( hasattr( self, "__exponent__" ) ):
+            return
         self.__exponent__ = exponent
-        self.__logExponent__ = numpy.log( exponent )
+        self.__logExponent__ = math.log( exponent )
+        self.__key__ = ( self.__class__, exponent )
     
     
     def __invert__( self ):
@@ -167,17 +386,24 @@ class __ExpOperator__( UnitOperator ):
         return False
     
     
-    def convert( self, value ):
+    def convert( self, value, out=None ):
         """! @brief Convert a value.
               
               This method performs raises the current value
               to the exponent.
+              @note Scalars are evaluated using the math module, 
+                    instances of numpy.ndarray are evaluated element-wise
+                    using numpy.
               @param self
               @param value The value to convert.
+              @param out An optional array the converted array may be
+                         written to (the result is returned anyway).
               @return The converted value
         """
-        assert( operator.isNumberType( value ) )
-        return numpy.exp( self.__logExponent__ * float( value ) )
+        if( isinstance( value, _ndarray ) ):
+            out = _numpy_multiply( value, self.__logExponent__, out )
+            return _numpy_exp( out, out )
+        return _scalar_exp( self.__logExponent__ * float( value ) )
     
     def get_exponent( self ):
         """! @brief Get the base of logarithm.
@@ -189,8 +415,20 @@ class __ExpOperator__( UnitOperator ):
         """
         return self.__exponent__
     
-    def __str__( self ):
-        """! @brief Represent this operation by a string.
+    def _emit_expr( self, var, constants ):
+        """! @brief Emit the source code of an expression performing
+              this operation.
+              @param self
+              @param var The source code of the expression to convert.
+              @param constants A list of objects referenced by the
+                               expression.
+              @return The source code of the expression.
+        """
+        index = UnitOperator._constant( constants, self.__logExponent__ )
+        return "_exp(_c%d*_float(%s))" % ( index, var )
+    
+    def _compute_str( self ):
+        """! @brief Build the string representing this operation.
              
               @param self
               @return A string describing this operation.
@@ -200,42 +438,49 @@ class __ExpOperator__( UnitOperator ):
     def __getstate__( self ):
         """! @brief Serialization using pickle.
               @param self
-              @return A string that represents the serialized form
-                      of this instance.
+              @return A tuple holding the exponent of this instance.
         """
-        return ( self.__exponent__ )
+        return ( self.__exponent__, )
     
     def __setstate__( self, state ):
         """! @brief Deserialization using pickle.
               @param self
               @param state The state of the object.
         """
-        self.__exponent__ = state
+        self.__exponent__, = UnitOperator._state_tuple( state )
+        self.__logExponent__ = math.log( self.__exponent__ )
+        self.__key__ = ( self.__class__, self.__exponent__ )
     
-    def __eq__( self, other ):
-        """! @brief Test for equality.
-              @param self
-              @param other Another UnitOperator.
-        """
-        if( not isinstance( other, __ExpOperator__ ) ):
-            return False
-        return self.__exponent__ == other.__exponent__
 
 class LogOperator( UnitOperator ):
     """! @brief       This class provides an interface for logarithmic operators.
       @note Instances of this class can be serialized using pickle.
     """
     
-    def __init__( self, base ):
+    ## Attributes of the instances.
+    __slots__ = ( "__base__", "__logBase__", "__invLogBase__" )
+    
+    ## Instances of this class, indexed by their constructor arguments.
+    __instances__ = weakref.WeakValueDictionary()
+    
+    def __init__( self, base=None ):
         """! @brief Default constructor.
              
               Initializes this operator and assigns the base to it.
               @param self
               @param base The base of the logarithm.
         """
+        # unpickled instance, the state is set by __setstate__
+        if( base is None ):
+            return
         assert( operator.isNumberType( base ) )
+        # reused instance, see UnitOperator.__new__
+        if( hasattr( self, "__base__" ) ):
+            return
         self.__base__ = base
-        self.__logBase__ = numpy.log( base )
+        self.__logBase__ = math.log( base )
+        self.__invLogBase__ = 1.0 / self.__logBase__
+        self.__key__ = ( self.__class__, base )
     
     
     def __invert__( self ):
@@ -259,20 +504,27 @@ class LogOperator( UnitOperator ):
         return False
     
     
-    def convert( self, value ):
+    def convert( self, value, out=None ):
         """! @brief Convert a value.
               
               This method performs the logarithm on an
               absolute value.
               @attention The logarithm for complex values is not
                          defined.
+              @note Scalars are evaluated using the math module, 
+                    instances of numpy.ndarray are evaluated element-wise
+                    using numpy.
               @param self
               @param value The value to convert.
+              @param out An optional array the converted array may be
+                         written to (the result is returned anyway).
               @exception TypeError If the argument is a complex number.
               @return The converted value
         """
-        assert( operator.isNumberType( value ) )
-        return numpy.log( float( value ) )/self.__logBase__
+        if( isinstance( value, _ndarray ) ):
+            out = _numpy_log( value, out )
+            return _numpy_multiply( out, self.__invLogBase__, out )
+        return _scalar_log( float( value ) ) * self.__invLogBase__
     
     def get_base( self ):
         """! @brief Get the base of this logarithm.
@@ -284,8 +536,20 @@ class LogOperator( UnitOperator ):
         """
         return self.__base__
     
-    def __str__( self ):
-        """! @brief Represent this operation by a string.
+    def _emit_expr( self, var, constants ):
+        """! @brief Emit the source code of an expression performing
+              this operation.
+              @param self
+              @param var The source code of the expression to convert.
+              @param constants A list of objects referenced by the
+                               expression.
+              @return The source code of the expression.
+        """
+        index = UnitOperator._constant( constants, self.__invLogBase__ )
+        return "(_log(_float(%s))*_c%d)" % ( var, index )
+    
+    def _compute_str( self ):
+        """! @brief Build the string representing this operation.
              
               @param self
               @return A string describing this operation.
@@ -295,27 +559,20 @@ class LogOperator( UnitOperator ):
     def __getstate__( self ):
         """! @brief Serialization using pickle.
               @param self
-              @return A string that represents the serialized form
-                      of this instance.
+              @return A tuple holding the base of this instance.
         """
-        return ( self.__base__ )
+        return ( self.__base__, )
     
     def __setstate__( self, state ):
         """! @brief Deserialization using pickle.
               @param self
               @param state The state of the object.
         """
-        self.__base__ = state
-        self.__logBase__ = numpy.log( self.__base__ )
+        self.__base__, = UnitOperator._state_tuple( state )
+        self.__logBase__ = math.log( self.__base__ )
+        self.__invLogBase__ = 1.0 / self.__logBase__
+        self.__key__ = ( self.__class__, self.__base__ )
     
-    def __eq__( self, other ):
-        """! @brief Test for equality.
-              @param self
-              @param other Another UnitOperator.
-        """
-        if( not isinstance( other, LogOperator ) ):
-            return False
-        return self.__base__ == other.__base__
     
 class AddOperator( UnitOperator ):
     """! @brief       This class provides an Interface for offset operators.
@@ -324,6 +581,14 @@ class AddOperator( UnitOperator ):
       @note Instances of this class can be serialized using pickle.
     """
     
+    ## Attributes of the instances.
+    __slots__ = ( "__offset__", )
+    
+    ## Instances of this class, indexed by their constructor arguments.
+    __instances__ = weakref.WeakValueDictionary()
+    
+    __PLAIN_TYPES = ( int, long, float )
+    
     def __isNegative( positvieOp, negativeOp ):
         """! @brief Helper method to optimize comparsions.
               @param negativeOp An AddOperator.
@@ -335,6 +600,12 @@ class AddOperator( UnitOperator ):
         
         negOffset = negativeOp.get_offset()
         posOffset = positvieOp.get_offset()
+        # plain numbers are compared directly, floats never cancel out
+        if( negOffset.__class__ in AddOperator.__PLAIN_TYPES and \
+            posOffset.__class__ in AddOperator.__PLAIN_TYPES ):
+            if( negOffset.__class__ is float or posOffset.__class__ is float ):
+                return False
+            return ( posOffset == -negOffset )
         # convert to rational number
         try:
             negOffset = arithmetic.RationalNumber.value_of( negOffset )
@@ -343,9 +614,9 @@ class AddOperator( UnitOperator ):
             return False
         
         return ( posOffset == -negOffset )
-        __isNegative = staticmethod( __isNegative )
+    __isNegative = staticmethod( __isNegative )
         
-    def __init__( self, offset ):
+    def __init__( self, offset=None ):
         """! @brief Default constructor.
              
               Initializes the operator and assigns the offset to the
@@ -353,8 +624,15 @@ class AddOperator( UnitOperator ):
               @param self
               @param offset The offset of this operator.
         """
+        # unpickled instance, the state is set by __setstate__
+        if( offset is None ):
+            return
         assert( operator.isNumberType( offset ) )
+        # reused instance, see UnitOperator.__new__
+        if( hasattr( self, "__offset__" ) ):
+            return
         self.__offset__ = offset
+        self.__key__ = ( self.__class__, offset )
     
     def __mul__( self, otherOperator ):
         """! @brief Perform the current operation on another operator.
@@ -401,17 +679,24 @@ class AddOperator( UnitOperator ):
         return False
     
     
-    def convert( self, value ):
+    def convert( self, value, out=None ):
         """! @brief Convert a value.
               
               This method performs the addition of an offset on an
               absolute value.
               @param self
               @param value The value to convert.
+              @param out An optional array the converted array may be
+                         written to (the result is returned anyway).
               @return The converted value
         """
-        assert( operator.isNumberType( value ) )
-        return value+self.get_offset()
+        if( isinstance( value, _ndarray ) ):
+            if( self.__offset__.__class__ in AddOperator.__PLAIN_TYPES ):
+                return _numpy_add( value, self.__offset__, out )
+            if( value.dtype.kind in "fc" ):
+                # exact offsets would result in an array of objects
+                return _numpy_add( value, float( self.__offset__ ), out )
+        return value + self.__offset__
     
     def get_offset( self ):
         """! @brief Get the offset.
@@ -423,12 +708,27 @@ class AddOperator( UnitOperator ):
         """
         return self.__offset__
     
-    def __str__( self ):
-        """! @brief Represent this operation by a string.
+    def _emit_expr( self, var, constants ):
+        """! @brief Emit the source code of an expression performing
+              this operation.
+              @param self
+              @param var The source code of the expression to convert.
+              @param constants A list of objects referenced by the
+                               expression.
+              @return The source code of the expression.
+        """
+        index = UnitOperator._constant( constants, self.__offset__ )
+        return "(%s+_c%d)" % ( var, index )
+    
+    def _compute_str( self ):
+        """! @brief Build the string representing this operation.
              
               @param self
               @return A string describing this operation.
         """
+        if( self.__offset__.__class__ in AddOperator.__PLAIN_TYPES ):
+            # the sign is added by the format specification
+            return format( self.__offset__, "+" )
         offset = abs( self.__offset__ )
         if( self.__offset__ < 0.0 ):
             return "-"+str( offset )
@@ -438,26 +738,20 @@ class AddOperator( UnitOperator ):
     def __getstate__( self ):
         """! @brief Serialization using pickle.
               @param self
-              @return A string that represents the serialized form
-                      of this instance.
+              @return A tuple holding the offset of this instance.
+                      A tuple is used, since pickle ignores false
+                      states like 0.
         """
-        return ( self.__offset__ )
+        return ( self.__offset__, )
     
     def __setstate__( self, state ):
         """! @brief Deserialization using pickle.
               @param self
               @param state The state of the object.
         """
-        self.__offset__ = state
+        self.__offset__, = UnitOperator._state_tuple( state )
+        self.__key__ = ( self.__class__, self.__offset__ )
     
-    def __eq__( self, other ):
-        """! @brief Test for equality.
-              @param self
-              @param other Another UnitOperator.
-        """
-        if( not isinstance( other, AddOperator ) ):
-            return False
-        return self.__offset__ == other.__offset__
 
 class MultiplyOperator( UnitOperator ):
     """! @brief       This class provides an Interface for factor operators.
@@ -466,6 +760,23 @@ class MultiplyOperator( UnitOperator ):
       @note Instances of this class can be serialized using pickle.
     """
     
+    ## Attributes of the instances.
+    __slots__ = ( "__factor__", )
+    
+    ## Instances of this class, indexed by their constructor arguments.
+    __instances__ = weakref.WeakValueDictionary()
+    
+    ## Inversion of factors, selected by the class of the factor.
+    #
+    #  Integer factors are inverted to rational numbers in order to
+    #  preserve their accuracy. Factors of other types are inverted
+    #  using floating point division.
+    __invertFactor = { int  : lambda f: arithmetic.RationalNumber( 1L, f ),
+                       long : lambda f: arithmetic.RationalNumber( 1L, f ),
+                       arithmetic.RationalNumber : operator.inv }
+    
+    __PLAIN_TYPES = ( int, long, float )
+    
     def __isNegative( positvieOp, negativeOp ):
         """! @brief Helper method to optimize comparsions.
               @param negativeOp An MultiplyOperator.
@@ -477,6 +788,12 @@ class MultiplyOperator( UnitOperator ):
         
         negFactor = negativeOp.get_factor()
         posFactor = positvieOp.get_factor()
+        # plain numbers are compared directly, floats never cancel out
+        if( negFactor.__class__ in MultiplyOperator.__PLAIN_TYPES and \
+            posFactor.__class__ in MultiplyOperator.__PLAIN_TYPES ):
+            if( negFactor.__class__ is float or posFactor.__class__ is float ):
+                return False
+            return ( posFactor * negFactor == 1 )
         # convert to rational number
         try:
             negFactor = arithmetic.RationalNumber.value_of( negFactor )
@@ -485,9 +802,9 @@ class MultiplyOperator( UnitOperator ):
             return False
         
         return ( negFactor == ~posFactor )
-        __isNegative = staticmethod( __isNegative )
+    __isNegative = staticmethod( __isNegative )
     
-    def __init__( self, factor ):
+    def __init__( self, factor=None ):
         """! @brief Default constructor.
              
               Initializes this operator and assigns the factor to the
@@ -495,8 +812,15 @@ class MultiplyOperator( UnitOperator ):
               @param self
               @param factor The offset of this operator.
         """
+        # unpickled instance, the state is set by __setstate__
+        if( factor is None ):
+            return
         assert( operator.isNumberType( factor ) )
+        # reused instance, see UnitOperator.__new__
+        if( hasattr( self, "__factor__" ) ):
+            return
         self.__factor__ = factor
+        self.__key__ = ( self.__class__, factor )
     
     
     def __mul__( self, otherOperator ):
@@ -531,16 +855,11 @@ class MultiplyOperator( UnitOperator ):
               @param self
               @return The inverse Operation of the current Operation.
         """
-        # Optimize for integer accuracy
-        if( isinstance( self.__factor__, long ) or 
-            isinstance( self.__factor__, int ) ):
-            return MultiplyOperator( arithmetic.RationalNumber( 1L, 
-                                    self.__factor__ ) )
-        # Optimize rational factors
-        if( isinstance( self.__factor__, arithmetic.RationalNumber ) ):
-            return MultiplyOperator( ~self.__factor__ )
-        # no optimization possible for other types
-        return MultiplyOperator( 1.0 / self.__factor__ )
+        invert = self.__invertFactor.get( self.__factor__.__class__ )
+        if( invert is None ):
+            # no optimization possible for other types
+            return MultiplyOperator( 1.0 / self.__factor__ )
+        return MultiplyOperator( invert( self.__factor__ ) )
     
     
     def is_linear( self ):
@@ -553,16 +872,23 @@ class MultiplyOperator( UnitOperator ):
         return True
     
     
-    def convert( self, value ):
+    def convert( self, value, out=None ):
         """! @brief Convert a value.
               
               This method performs the multiplication with an factor on an
               absolute value.
               @param self
               @param value The value to convert.
+              @param out An optional array the converted array may be
+                         written to (the result is returned anyway).
               @return The converted value.
         """
-        assert( operator.isNumberType( value ) )
+        if( isinstance( value, _ndarray ) ):
+            if( self.__factor__.__class__ in MultiplyOperator.__PLAIN_TYPES ):
+                return _numpy_multiply( value, self.__factor__, out )
+            if( value.dtype.kind in "fc" ):
+                # exact factors would result in an array of objects
+                return _numpy_multiply( value, float( self.__factor__ ), out )
         return value * self.__factor__
     
     
@@ -576,8 +902,20 @@ class MultiplyOperator( UnitOperator ):
         """
         return self.__factor__
     
-    def __str__( self ):
-        """! @brief Represent this operation by a string.
+    def _emit_expr( self, var, constants ):
+        """! @brief Emit the source code of an expression performing
+              this operation.
+              @param self
+              @param var The source code of the expression to convert.
+              @param constants A list of objects referenced by the
+                               expression.
+              @return The source code of the expression.
+        """
+        index = UnitOperator._constant( constants, self.__factor__ )
+        return "(%s*_c%d)" % ( var, index )
+    
+    def _compute_str( self ):
+        """! @brief Build the string representing this operation.
              
               @param self
               @return A string describing this operation.
@@ -587,26 +925,171 @@ class MultiplyOperator( UnitOperator ):
     def __getstate__( self ):
         """! @brief Serialization using pickle.
               @param self
-              @return A string that represents the serialized form
-                      of this instance.
+              @return A tuple holding the factor of this instance.
+                      A tuple is used, since pickle ignores false
+                      states like 0.
         """
-        return ( self.__factor__ )
+        return ( self.__factor__, )
     
     def __setstate__( self, state ):
         """! @brief Deserialization using pickle.
               @param self
               @param state The state of the object.
         """
-        self.__factor__ = state
+        self.__factor__, = UnitOperator._state_tuple( state )
+        self.__key__ = ( self.__class__, self.__factor__ )
     
-    def __eq__( self, other ):
-        """! @brief Test for equality.
+    
+
+class AffineOperator( UnitOperator ):
+    """! @brief       This class provides an Interface for affine operators.
+     
+      This class multiplies an existing Operator with a factor and adds 
+      an offset afterwards, i.e. it models @f$ a \times f(x) + b @f$.
+      Compound operators use it to evaluate sequences of MultiplyOperator 
+      and AddOperator in a single step.
+      @note Instances of this class can be serialized using pickle.
+    """
+    
+    ## Attributes of the instances.
+    __slots__ = ( "__factor__", "__offset__" )
+    
+    ## Instances of this class, indexed by their constructor arguments.
+    __instances__ = weakref.WeakValueDictionary()
+    
+    __PLAIN_TYPES = ( int, long, float )
+    
+    def __init__( self, factor, offset ):
+        """! @brief Default constructor.
+             
+              Initializes this operator and assigns the factor and the
+              offset to the current operator.
               @param self
-              @param other Another UnitOperator.
+              @param factor The factor of this operator.
+              @param offset The offset of this operator.
         """
-        if( not isinstance( other, MultiplyOperator ) ):
-            return False
-        return self.__factor__ == other.__factor__
+        assert( operator.isNumberType( factor ) )
+        assert( operator.isNumberType( offset ) )
+        # reused instance, see UnitOperator.__new__
+        if( hasattr( self, "__factor__" ) ):
+            return
+        self.__factor__ = factor
+        self.__offset__ = offset
+        self.__key__ = ( self.__class__, factor, offset )
+    
+    def fuse( operators ):
+        """! @brief Fuse a sequence of offset and factor operators.
+              @param operators A list of instances of AddOperator and 
+                               MultiplyOperator in the order they are
+                               performed.
+              @return An AffineOperator performing the operators.
+        """
+        factor = 1
+        offset = 0
+        for op in operators:
+            if( isinstance( op, MultiplyOperator ) ):
+                factor = factor * op.get_factor()
+                offset = offset * op.get_factor()
+            else:
+                assert( isinstance( op, AddOperator ) )
+                offset = offset + op.get_offset()
+        return AffineOperator( factor, offset )
+    fuse = staticmethod( fuse )
+    
+    def __invert__( self ):
+        """! @brief Invert the current operation.
+             
+              For example let this operator be @f$ a \times f(x) + b @f$ 
+                       then the inverse is 
+                       @f$ \frac{1}{a} \times f(x) - \frac{b}{a} @f$.
+              @param self
+              @return The inverse Operation of the current Operation.
+        """
+        factor = ( ~MultiplyOperator( self.__factor__ ) ).get_factor()
+        return AffineOperator( factor, -self.__offset__ * factor )
+    
+    def is_linear( self ):
+        """! @brief Check if the operator is linear.
+              
+              This operator is only linear if the offset is zero.
+              @param self
+              @return True, if the offset is zero.
+        """
+        return ( self.__offset__ == 0 )
+    
+    def convert( self, value, out=None ):
+        """! @brief Convert a value.
+              
+              This method performs the multiplication with the factor and 
+              the addition of the offset on an absolute value.
+              @param self
+              @param value The value to convert.
+              @param out An optional array the converted array may be
+                         written to (the result is returned anyway).
+              @return The converted value.
+        """
+        if( isinstance( value, _ndarray ) ):
+            if( self.__factor__.__class__ in AffineOperator.__PLAIN_TYPES and
+                self.__offset__.__class__ in AffineOperator.__PLAIN_TYPES ):
+                out = _numpy_multiply( value, self.__factor__, out )
+                return _numpy_add( out, self.__offset__, out )
+            if( value.dtype.kind in "fc" ):
+                # exact constants would result in an array of objects
+                out = _numpy_multiply( value, float( self.__factor__ ), out )
+                return _numpy_add( out, float( self.__offset__ ), out )
+        return value * self.__factor__ + self.__offset__
+    
+    def get_factor( self ):
+        """! @brief Get the factor.
+              @param self
+              @return The factor of this operator.
+        """
+        return self.__factor__
+    
+    def get_offset( self ):
+        """! @brief Get the offset.
+              @param self
+              @return The offset of this operator.
+        """
+        return self.__offset__
+    
+    def _emit_expr( self, var, constants ):
+        """! @brief Emit the source code of an expression performing
+              this operation.
+              @param self
+              @param var The source code of the expression to convert.
+              @param constants A list of objects referenced by the
+                               expression.
+              @return The source code of the expression.
+        """
+        factor = UnitOperator._constant( constants, self.__factor__ )
+        offset = UnitOperator._constant( constants, self.__offset__ )
+        return "(%s*_c%d+_c%d)" % ( var, factor, offset )
+    
+    def _compute_str( self ):
+        """! @brief Build the string representing this operation.
+             
+              @param self
+              @return A string describing this operation.
+        """
+        return str( AddOperator( self.__offset__ ) ) + \
+               "(*"+str( self.__factor__ )+")"
+    
+    def __getstate__( self ):
+        """! @brief Serialization using pickle.
+              @param self
+              @return A tuple holding the factor and the offset of this
+                      instance.
+        """
+        return ( self.__factor__, self.__offset__ )
+    
+    def __setstate__( self, state ):
+        """! @brief Deserialization using pickle.
+              @param self
+              @param state The state of the object.
+        """
+        ( self.__factor__, self.__offset__ ) = state
+        self.__key__ = ( self.__class__, self.__factor__, self.__offset__ )
     
 
 class CompoundOperator( UnitOperator ):
@@ -617,35 +1100,127 @@ class CompoundOperator( UnitOperator ):
       @note Instances of this class can be serialized using pickle.
     """
     
-    def __init__( self, firstOp, secondOp ):
+    ## Attributes of the instances.
+    __slots__ = ( "__operators__", "__stages__", "__function__" )
+    
+    def __init__( self, firstOp=None, secondOp=None, *nextOps ):
         """! @brief Default Constructor 
              
               For example let the secondOp be @f$ g(x) @f$ and
                        the firstOp be @f$ f(x) @f$ then
                        the compound Operator models @f$ f(g(x)) @f$.
+              @note Compound operators passed as arguments are not nested.
+                    Their operators are spliced into the flat sequence of
+                    operators of this instance.
               @param self
               @param firstOp  The operator that is performed at first.
-              @param secondOp The operator that is performed at last.
-        """
-        assert( isinstance( firstOp, UnitOperator ) )
-        assert( isinstance( secondOp, UnitOperator ) )
-        self.__firstOperator__ = firstOp
-        self.__secondOperator__ = secondOp
-    
+              @param secondOp The operator that is performed next.
+              @param nextOps  Further operators that are performed after
+                              secondOp.
+        """
+        # unpickled instance, the state is set by __setstate__
+        if( firstOp is None ):
+            return
+        operators = []
+        for op in ( firstOp, secondOp ) + nextOps:
+            assert( isinstance( op, UnitOperator ) )
+            operators += CompoundOperator.__flatten( op )
+        self.__assign( operators )
+    
+    def __assign( self, operators ):
+        """! @brief Helper method to assign the flat sequence of operators.
+              @param self
+              @param operators A list of elementary operators in the order
+                               they are performed.
+        """
+        self.__operators__ = operators
+        self.__key__ = CompoundOperator.__operatorsKey( operators )
+        self.__stages__ = None
+        self.__function__ = None
+    
+    def __fromOperators( operators ):
+        """! @brief Helper method to create a compound operator from an
+              already flat sequence of operators, bypassing the checks 
+              of the constructor.
+              @param operators A list of elementary operators in the order
+                               they are performed.
+              @return A new CompoundOperator.
+        """
+        compound = UnitOperator.__new__( CompoundOperator )
+        compound.__assign( operators )
+        return compound
+    __fromOperators = staticmethod( __fromOperators )
+    
+    def __flatten( op ):
+        """! @brief Helper method to get the sequence of operators of an 
+              operator.
+              @param op An operator.
+              @return A new list of the operators forming the argument, in
+                      the order they are performed.
+        """
+        if( isinstance( op, CompoundOperator ) ):
+            return list( op.__operators__ )
+        return [op]
+    __flatten = staticmethod( __flatten )
+    
+    def __fuseStages( operators ):
+        """! @brief Helper method to get the stages performed by a
+              compound operator.
+              
+              Consecutive instances of MultiplyOperator and AddOperator
+              are fused into a single AffineOperator.
+              @param operators A list of operators.
+              @return A list of operators equivalent to the argument.
+        """
+        stages = []
+        run = []
+        for op in operators + [None]:
+            if( isinstance( op, ( AddOperator, MultiplyOperator ) ) ):
+                run += [op]
+                continue
+            if( len( run ) > 1 ):
+                stages += [AffineOperator.fuse( run )]
+            else:
+                stages += run
+            run = []
+            if( op is not None ):
+                stages += [op]
+        return stages
+    __fuseStages = staticmethod( __fuseStages )
+    
+    def __operatorsKey( operators ):
+        """! @brief Helper method to get the key of a sequence of operators.
+              @param operators A list of operators.
+              @return The key of a compound operator performing the
+                      operators.
+        """
+        key = [CompoundOperator]
+        for op in operators:
+            key += [op.__key__]
+        return tuple( key )
+    __operatorsKey = staticmethod( __operatorsKey )
     
     def __invert__( self ):
         """! @brief Invert the current operation.
              
               This method returns the inverse Operation of the current
-              operation. Since this Operation is based on two Operations
+              operation. Since this Operation is based on several Operations
               the operations are inverted in the reverse order.
               For example let this Operator model @f$y = f(g(x))@f$ the inverse 
                        Operator models @f$ x = g^{-1}(f^{-1}(y))@f$.
               @param self
               @return The inverse operation of the current operation.
         """
-        return CompoundOperator( self.__secondOperator__.__invert__(), 
-                    self.__firstOperator__.__invert__() )
+        return CompoundOperator.__fromOperators( 
+                                   [~op for op in reversed( self.__operators__ )] )
+    
+    def get_operators( self ):
+        """! @brief Get the elementary operators forming this operator.
+              @param self
+              @return A list of the operators in the order they are 
+                      performed.
+        """
+        return list( self.__operators__ )
     
     
     def is_linear( self ):
@@ -654,57 +1229,113 @@ class CompoundOperator( UnitOperator ):
               This operator is linear if the underlying operators 
               are linear.
               @param self The current instance of this class.
-              @return <tt>True</tt> if both underlying operators are linear.
+              @return <tt>True</tt> if all underlying operators are linear.
         """
-        return ( self.__firstOperator__.is_linear() 
-            and self.__secondOperator__.is_linear() )
+        for op in self.__operators__:
+            if( not op.is_linear() ):
+                return False
+        return True
 
     
-    def convert( self, value ):
+    def convert( self, value, out=None ):
         """! @brief Convert a value.
               
               This method performs the desired operation on an
-              absolute value.
+              absolute value. Consecutive offset and factor operators
+              are performed at once by an AffineOperator. For scalar
+              values, the operators are compiled into a single function
+              when this method is called for the first time.
               @param self The current instance of this class.
               @param value The value to convert.
+              @param out An optional array the converted array may be
+                         written to (the result is returned anyway).
               @return the converted value
         """
-        innerValue = self.__firstOperator__.convert( value )
-        return self.__secondOperator__.convert( innerValue )
+        function = self.__function__
+        if( function is None ):
+            self.__stages__ = CompoundOperator.__fuseStages( 
+                                                         self.__operators__ )
+            function = CompoundOperator.__compileFunction( self.__stages__ )
+            self.__function__ = function
+        
+        if( isinstance( value, _ndarray ) ):
+            # arrays are converted by the operators themselves, 
+            # intermediate floating point results are overwritten
+            result = value
+            for op in self.__stages__:
+                if( result is not value and result.dtype == float ):
+                    out = result
+                result = op.convert( result, out )
+            return result
+        return function( value )
+    
+    def __compileFunction( stages ):
+        """! @brief Helper method to compile a sequence of operators.
+              
+              The expressions emitted by the operators are nested and 
+              compiled into a single function. The constants of the 
+              operators are bound as default arguments of this function.
+              @param stages A list of operators.
+              @return A function converting a scalar value.
+        """
+        constants = []
+        expression = "v"
+        for op in stages:
+            expression = op._emit_expr( expression, constants )
+        
+        arguments = ["v", "_log=_log", "_exp=_exp", "_float=_float"]
+        for index in range( len( constants ) ):
+            arguments += ["_c%d=_c[%d]" % ( index, index )]
+        source = "lambda "+", ".join( arguments )+": "+expression
+        return eval( source, { "_c"     : constants,
+                               "_log"   : _scalar_log,
+                               "_exp"   : _scalar_exp,
+                               "_float" : float } )
+    __compileFunction = staticmethod( __compileFunction )
+    
+    def convert_array( self, values ):
+        """! @brief Convert an array of values.
+              
+              This method copies the values into a floating point array
+              once, and converts this array in-place using 
+              CompoundOperator.convert.
+              @attention The result is a floating point array. Complex
+                         values are not supported.
+              @param self
+              @param values A sequence or instance of numpy.ndarray.
+              @return A new instance of numpy.ndarray holding the
+                      converted values.
+        """
+        result = numpy.array( values, dtype=float )
+        return self.convert( result, result )
     
-    def __str__( self ):
-        """! @brief Represent this operation by a string.
+    def _compute_str( self ):
+        """! @brief Build the string representing this operation.
              
               @param self
               @return A string describing this operation.
         """
-        return str( self.__firstOperator__ )+\
-               "("+str( self.__secondOperator__ )+")"
+        strings = [ str( op ) for op in self.__operators__ ]
+        return "(".join( strings )+")"*( len( strings ) - 1 )
     
     def __getstate__( self ):
         """! @brief Serialization using pickle.
               @param self
-              @return A string that represents the serialized form
-                      of this instance.
+              @return A tuple holding the operators of this instance.
         """
-        return ( self.__firstOperator__, self.__secondOperator__ )
+        return tuple( self.__operators__ )
     
     def __setstate__( self, state ):
         """! @brief Deserialization using pickle.
               @param self
               @param state The state of the object.
+              @note The state may also be a pair of (nested) operators.
         """
-        self.__firstOperator__, self.__secondOperator__ = state
+        operators = []
+        for op in state:
+            operators += CompoundOperator.__flatten( op )
+        self.__assign( operators )
     
-    def __eq__( self, other ):
-        """! @brief Test for equality.
-              @param self
-              @param other Another UnitOperator.
-        """
-        if( not isinstance( other, CompoundOperator ) ):
-            return False
-        return ( self.__firstOperator__ == other.__firstOperator__ and
-            self.__secondOperator__ == other.__secondOperator__ )
             
 class Identity( UnitOperator ):
     """! @brief       This class provides an Interface for the identity Operator.
@@ -717,6 +1348,15 @@ class Identity( UnitOperator ):
                  IDENTITY object of this module.
       @note Instances of this class can be serialized using pickle.
     """
+    
+    ## Attributes of the instances.
+    __slots__ = ()
+    
+    def __init__( self ):
+        """! @brief Default constructor.
+              @param self
+        """
+        self.__key__ = ( self.__class__, )
         
     def __mul__( self, otherOperator ):
         """! @brief Perform the current operation on another operator.
@@ -754,18 +1394,31 @@ class Identity( UnitOperator ):
         return True
 
     
-    def convert( self, value ):
+    def convert( self, value, out=None ):
         """! @brief Convert a value.
               
               This method returns the parameter.
               @param self
               @param value The value to convert (will be returned).
+              @param out An optional array the converted array may be
+                         written to (the result is returned anyway).
               @return The parameter value
         """
         return value
     
-    def __str__( self ):
-        """! @brief Represent this operation by a string.
+    def _emit_expr( self, var, constants ):
+        """! @brief Emit the source code of an expression performing
+              this operation.
+              @param self
+              @param var The source code of the expression to convert.
+              @param constants A list of objects referenced by the
+                               expression.
+              @return The source code of the expression.
+        """
+        return var
+    
+    def _compute_str( self ):
+        """! @brief Build the string representing this operation.
              
               @param self
               @return A string describing this operation.
@@ -775,24 +1428,16 @@ class Identity( UnitOperator ):
     def __getstate__( self ):
         """! @brief Serialization using pickle.
               @param self
-              @return A string that represents the serialized form
-                      of this instance.
+              @return The tuple <tt>( 1, )</tt>.
         """
-        return ( 1 )
+        return ( 1, )
     
     def __setstate__( self, state ):
         """! @brief Deserialization using pickle.
               @param self
               @param state The state of the object.
         """
-        assert ( state == 1 )
-    
-    def __eq__( self, other ):
-        """! @brief Test for equality.
-              @param self
-              @param other Another UnitOperator.
-        """
-        return isinstance( other, Identity )
+        self.__key__ = ( self.__class__, )
     
 ## Global Identity Operator.
 #  
@@ -20,21 +20,16 @@
 class QuantitiesException( Exception ):
     """! @brief       General class for qexceptions of this module.
     """
-    
-    def __init__( self, *args ):
-        """! @brief Default constructor.
-             
-               @param self
-               @param args Arguments of this exception
-        """
-        Exception.__init__( self, *args )
 
-class UnitExistsException( QuantitiesException ):
-    """! @brief       Exception that is raised when a dimension, base unit, or
-       alternate unit of the same type has already been created.
-      @see units.BaseUnit
-      @see units.AlternateUnit
-      @see units.Dimension
+class __UnitException__( QuantitiesException ):
+    """! @brief       Base class of the exceptions that refer to a unit.
+       It provides the constructor and the message shared by its 
+       silblings. The unit is stored as first element of 
+       <tt>args</tt>, followed by the further arguments. These are
+       either a message, or a message template followed by the values
+       to format it with. The template is only formatted if the 
+       exception is displayed. Further arguments that do not match 
+       the first one as template are displayed as tuple.
     """
     
     def __init__( self, unit, *args ):
@@ -42,88 +37,86 @@ class UnitExistsException( QuantitiesException ):
              
                @param self
                @param unit The unit that raised this exception.
-               @param args Additional arguments of this exception.
+               @param args Additional arguments of this exception, i.e.
+                      a message or a template and its values.
         """
-        QuantitiesException.__init__( self, *args )
-        self.__unit__ = unit
+        Exception.__init__( self, unit, *args )
+    
+    def __getUnit( self ):
+        """! @brief Get the unit that raised this exception.
+              @param self
+              @return The unit that raised this exception.
+        """
+        return self.args[0]
+    
+    ## The unit that raised this exception.
+    __unit__ = property( __getUnit )
         
     def __str__( self ):
         """! @brief Returns a string describing this exception.
+              @note This is the only override of Exception.__str__ in
+                    this module. It is needed to render the message
+                    before the unit and to defer formatting the template;
+                    Exception.__str__ would display the tuple 
+                    <tt>args</tt> instead.
               @param self
               @return A string that describes this exception.
         """
-        return QuantitiesException.__str__( self )+" :"+\
-               self.__unit__.__str__()
-    
-class ConversionException( QuantitiesException ):
+        try:
+            return self.__string__
+        except AttributeError:
+            # formatted once on demand, the exception might be caught
+            # without being displayed
+            args = self.args
+            if( len( args ) == 2 ):
+                message = args[1]
+            elif( len( args ) == 1 ):
+                message = ""
+            else:
+                try:
+                    message = args[1] % args[2:]
+                except ( TypeError, ValueError, KeyError ):
+                    # no template, display the arguments like 
+                    # Exception.__str__ does
+                    message = str( args[1:] )
+            string = "%s :%s" % ( message, args[0] )
+            self.__string__ = string
+            return string
+
+class UnitExistsException( __UnitException__ ):
+    """! @brief       Exception that is raised when a dimension, base unit, or
+       alternate unit of the same type has already been created.
+      @see units.BaseUnit
+      @see units.AlternateUnit
+      @see units.Dimension
+    """
+
+class ConversionException( __UnitException__ ):
     """! @brief       General exception that is raised whenever a
        unit conversion fails.
        @see units.Unit.to_system_unit
        @see units.Unit.get_operator_to
        @see operators.UnitOperator
     """
-    
-    def __init__( self, unit, *args ):
-        """! @brief Default constructor
-              @param self
-              @param unit Instance of a unit that raised
-                     the exception.
-              @param args Additional arguments of this exception.
-        """
-        QuantitiesException.__init__( self, *args )
-        self.__unit__ = unit
-        
-    def __str__( self ):
-        """! @brief Returns a string describing this exception.
-              @param self
-              @return A string that describes the exception.
-        """
-        return QuantitiesException.__str__( self )+" :"+\
-               self.__unit__.__str__()
-               
-class NotDimensionlessException( QuantitiesException ):
+
+class NotDimensionlessException( __UnitException__ ):
     """! @brief       Exception that is raised whenever a
        a unit is not dimensionless where it has to be.
     """
-    
-    def __init__( self, unit, *args ):
-        """! @brief Default constructor
-              @param self
-              @param unit Instance of a unit that raised
-                     the exception.
-              @param args Additional arguments of this exception.
-        """
-        QuantitiesException.__init__( self, *args )
-        self.__unit__ = unit
-        
-    def __str__( self ):
-        """! @brief Returns a string describing this exception.
-              @param self
-              @return A string that describes the exception.
-        """
-        return QuantitiesException.__str__( self )+" :"+\
-               self.__unit__.__str__()
 
-class UnknownUnitException( QuantitiesException ):
+class UnknownUnitException( __UnitException__ ):
     """! @brief       An exception that is raised whenever an unexpected unit was used.
        @see si.SIModel.get_dimension
     """
-    
-    def __init__( self, unit, *args ):
-        """! @brief The default constructor.
-              @param self
-              @param unit An instance of a unit that is unknown.
-              @param args Additional arguments of this exception.
-        """
-        QuantitiesException.__init__( self, *args )
-        self.__unit__ = unit
-        
-    def __str__( self ):
-        """! @brief Returns a string describing this exception.
-              @param self
-              @return String that describes the exception.
-        """
-        return QuantitiesException.__str__( self )+" :"+\
-               self.__unit__.__str__()
+
+## Sentinel returned instead of raising a ConversionException by 
+#  methods that accept a default value.
+#  @see units.Unit.get_operator_to
+CONVERSION_FAILED = object()
+
+## Sentinel returned instead of raising an UnknownUnitException by
+#  methods that accept a default value.
+#  @see si.SIModel.get_dimension
+UNKNOWN_UNIT = object()
 
 ## @}
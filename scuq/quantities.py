@@ -14,6 +14,9 @@
 # The converted array can be used as usual, however it lost the 
 # information about the unit. We suggest saving the default unit from 
 # the quantity before conversion takes place and reassign it to the result.
+# Alternatively, Quantity.array_of converts the input data to a single 
+# quantity holding an array, that can be passed to the fft module using 
+# <tt>numpy.asarray(quantity, complex)</tt>.
 # \example dft_example.py
 
 # This example shows the integration of SCUQ in NumPys linear algebra module
@@ -83,15 +86,59 @@
 # @{
 
 # standard module
+import math
 import operator
 import numpy
+import types
+import weakref
 
 # local modules
 import arithmetic
 import qexceptions
-import si
 import units
 
+## Types of values that are integer numbers.
+_INT_TYPES = ( int, long )
+
+## Rational numbers representing the small integers from -5 to 256. 
+#  Rational numbers are immutable, so they are shared by all quantities.
+_SMALL_RATIONALS = [ arithmetic.RationalNumber( i, 1 ) 
+                     for i in range( -5, 257 ) ]
+
+## Types of values that are numbers.
+_NUMERIC_TYPES = _INT_TYPES + ( float, complex, arithmetic.RationalNumber )
+
+## Types of values that are sequences.
+_SEQUENCE_TYPES = ( list, tuple, numpy.ndarray )
+
+## Types of values that are accepted by quantities without further checks.
+_VALUE_TYPES = _NUMERIC_TYPES + _SEQUENCE_TYPES
+
+## Creates an instance of a class from its attributes, without calling the
+#  constructor.
+_newInstance = types.InstanceType
+
+## The type of the results of the ufuncs of numpy for floating point numbers.
+_float64 = numpy.float64
+
+## Functions of the module math, indexed by the equivalent ufuncs of numpy.
+#  They are faster for single floating point numbers.
+_SCALAR_UFUNCS = { numpy.arccos  : math.acos,
+                   numpy.arccosh : math.acosh,
+                   numpy.arcsin  : math.asin,
+                   numpy.arcsinh : math.asinh,
+                   numpy.arctan  : math.atan,
+                   numpy.arctanh : math.atanh,
+                   numpy.cos     : math.cos,
+                   numpy.cosh    : math.cosh,
+                   numpy.tan     : math.tan,
+                   numpy.tanh    : math.tanh,
+                   numpy.log10   : math.log10,
+                   numpy.sin     : math.sin,
+                   numpy.sinh    : math.sinh,
+                   numpy.exp     : math.exp,
+                   numpy.log     : math.log }
+
 def set_strict(bValue = True):
     """! @brief       An abbreviation for Quantity.set_strict.
       @param bValue
@@ -112,10 +159,160 @@ class Quantity:
             a quantity is the right operand of the numeric types stated
             above.
       @note Instances of this class can be serialized using pickle.
+      @note This is a classic class, because the operations rely on 
+            Quantity.__coerce__ to convert their operands to quantities.
+            Thus, its instances cannot use <tt>__slots__</tt>. To keep 
+            them small, instances hold no attributes other than their 
+            unit and value.
     """
     
     __STRICT = True
     
+    ## Operators converting between two units, see Quantity.__lookup.
+    __OPERATORS = {}
+    
+    ## Products of two units, see Quantity.__lookup.
+    __PRODUCTS = {}
+    
+    ## Quotients of two units, see Quantity.__lookup.
+    __QUOTIENTS = {}
+    
+    ## Square roots of units, see Quantity.__lookupUnary.
+    __SQUARE_ROOTS = {}
+    
+    ## Maximum number of entries of each cache.
+    __CACHE_SIZE = 1024
+    
+    ## Types of values that are kept by the constructor, see 
+    #  Quantity.__accuracy.
+    __EXACT_TYPES = ( float, complex, arithmetic.RationalNumber, 
+                      numpy.ndarray )
+    
+    ## Priority of quantities holding arrays, higher than the one of arrays.
+    __ARRAY_PRIORITY = 1.0
+    
+    ## Priority of other quantities, the default priority of numpy.
+    __SCALAR_PRIORITY = -1000000.0
+    
+    def __make( unit, value ):
+        """! @brief Helper method to create the quantity resulting from an 
+              operation.
+              
+              The instance is created together with its attributes, the 
+              constructor is not called. Thus, the arguments are neither 
+              checked nor converted.
+              @param unit An instance of units.Unit.
+              @param value A value accepted by the constructor before or
+                           resulting from operations on such values.
+              @return A new instance of Quantity.
+        """
+        return _newInstance( Quantity, { "__unit__"  : unit, 
+                                         "__value__" : value } )
+    __make = staticmethod( __make )
+    
+    def __isTemporary( converted, original, value ):
+        """! @brief Helper method to check, if a converted array can hold
+              the result of an operation.
+              
+              The conversion of an array creates a temporary array. 
+              Writing the result of an element-wise operation to this array 
+              saves the allocation of another array of the same size.
+              @param converted The converted value.
+              @param original The value before conversion.
+              @param value The other operand of the operation.
+              @return True, if the converted value is a new array that has 
+                      the shape and type of the result.
+        """
+        return ( converted is not original and 
+                 isinstance( converted, numpy.ndarray ) and
+                 isinstance( value, numpy.ndarray ) and
+                 converted.shape == value.shape and
+                 numpy.result_type( value, converted ) == converted.dtype )
+    __isTemporary = staticmethod( __isTemporary )
+    
+    def __lookup( cache, unit1, unit2, function ):
+        """! @brief Helper method to get the cached result of a function
+              of two units.
+              
+              Units are immutable, so the results can be reused. The cache 
+              is indexed by the identities of the units. Units are not 
+              hashable, therefore each entry keeps weak references to 
+              its units to detect reused identities.
+              @param cache The dictionary holding the results.
+              @param unit1 The first argument of the function.
+              @param unit2 The second argument of the function.
+              @param function The function to call, if no result is cached.
+              @return The result of the function.
+        """
+        key = ( id( unit1 ), id( unit2 ) )
+        entry = cache.get( key )
+        if( entry is not None and entry[0]() is unit1 and 
+            entry[1]() is unit2 ):
+            return entry[2]
+        
+        result = function( unit1, unit2 )
+        if( len( cache ) >= Quantity.__CACHE_SIZE ):
+            cache.clear()
+        cache[key] = ( weakref.ref( unit1 ), weakref.ref( unit2 ), result )
+        return result
+    __lookup = staticmethod( __lookup )
+    
+    def __lookupUnary( cache, unit, function ):
+        """! @brief Helper method to get the cached result of a function
+              of one unit.
+              
+              Like Quantity.__lookup, but the cache is indexed by the 
+              identity of a single unit.
+              @param cache The dictionary holding the results.
+              @param unit The argument of the function.
+              @param function The function to call, if no result is cached.
+              @return The result of the function.
+        """
+        key = id( unit )
+        entry = cache.get( key )
+        if( entry is not None and entry[0]() is unit ):
+            return entry[1]
+        
+        result = function( unit )
+        if( len( cache ) >= Quantity.__CACHE_SIZE ):
+            cache.clear()
+        cache[key] = ( weakref.ref( unit ), result )
+        return result
+    __lookupUnary = staticmethod( __lookupUnary )
+    
+    def __getOperator( unitFrom, unitTo ):
+        """! @brief Helper method to get the operator converting between
+              two units.
+              @param unitFrom The unit to convert from.
+              @param unitTo The unit to convert to.
+              @return An operator converting values from unitFrom to unitTo.
+              @exception qexceptions.ConversionException If the units are
+                         not convertible.
+        """
+        return Quantity.__lookup( Quantity.__OPERATORS, unitFrom, unitTo,
+                                  units.Unit.get_operator_to )
+    __getOperator = staticmethod( __getOperator )
+    
+    def __multiplyUnits( unit1, unit2 ):
+        """! @brief Helper method to get the product of two units.
+              @param unit1 A unit.
+              @param unit2 Another unit.
+              @return The product of the units.
+        """
+        return Quantity.__lookup( Quantity.__PRODUCTS, unit1, unit2, 
+                                  operator.mul )
+    __multiplyUnits = staticmethod( __multiplyUnits )
+    
+    def __divideUnits( unit1, unit2 ):
+        """! @brief Helper method to get the quotient of two units.
+              @param unit1 The dividend.
+              @param unit2 The divisor.
+              @return The quotient of the units.
+        """
+        return Quantity.__lookup( Quantity.__QUOTIENTS, unit1, unit2, 
+                                  operator.div )
+    __divideUnits = staticmethod( __divideUnits )
+    
     def __unitComparsion( unit1, unit2 ):
         """! @brief Helper method. 
               @param unit1 A unit.
@@ -123,13 +320,15 @@ class Quantity:
               @return True if they are compatible and strict is disabled or True
                       if they are equal and strict is enabled.
         """
-        strict = Quantity.is_strict()
-        
         assert( isinstance( unit1, units.Unit ) )
         assert( isinstance( unit2, units.Unit ) )
         
-        return ( ( unit1 == unit2 ) or
-                ( unit1.is_compatible( unit2 ) and ( not strict ) ) )
+        if( unit1 is unit2 or unit1 == unit2 ):
+            return True
+        # the mode is read on every call, since it may be changed anytime
+        if( Quantity.__STRICT ):
+            return False
+        return unit1.is_compatible( unit2 )
     __unitComparsion = staticmethod( __unitComparsion )
     
     def __init__( self, unit, value ):
@@ -144,15 +343,18 @@ class Quantity:
                @see units.Dimensions
         """
         assert( isinstance( unit, units.Unit ) )
-        assert( operator.isNumberType( value ) or 
-                operator.isSequenceType( value ) or
-                isinstance( other, ucomponents.UncertainInput ) )
-        # switched arguments !
-        assert( not isinstance( value, units.Unit ) )
-        assert( not isinstance( value, Quantity ) )
+        # other numeric types (e.g. uncertain values) are checked by
+        # duck-typing, switched arguments !
+        assert( isinstance( value, _VALUE_TYPES ) or
+                ( ( operator.isNumberType( value ) or 
+                    operator.isSequenceType( value ) ) and
+                  not isinstance( value, ( units.Unit, Quantity ) ) ) )
         
         self.__unit__    = unit
-        self.__value__   = Quantity.__accuracy( value )
+        if( value.__class__ in Quantity.__EXACT_TYPES ):
+            self.__value__ = value
+        else:
+            self.__value__ = Quantity.__accuracy( value )
     
     def get_value( self, unit ):
         """! @brief Get the absolute value of the quantity using the specified unit.
@@ -165,10 +367,75 @@ class Quantity:
         """
         if( not Quantity.__unitComparsion( self.__unit__, unit ) ):
             raise qexceptions.ConversionException( unit, 
-                                                  " is not comparable to "
-                                                  +str( self.__unit__ ) )
+                                                  " is not comparable to %s",
+                                                  self.__unit__ )
+        
+        operator = Quantity.__getOperator( self.__unit__, unit )
+        return operator.convert( self.__value__ )
+    
+    def as_ndarray( self, unit ):
+        """! @brief Get the value of the quantity as floating point array.
+              
+              In contrast to Quantity.get_value, the value is converted to
+              floating point at once and expressed in the unit using numpy
+              ufuncs. Complex values are converted to complex floating 
+              point instead. No copy is made, if the unit equals the 
+              default unit of this quantity and the value already has 
+              this type.
+              @param self The current instance of this class.
+              @param unit The unit in which the quantity should be expressed in.
+              @return An instance of numpy.ndarray holding the value.
+              @exception qexceptions.ConversionException If the units are not
+                         comparable.
+        """
+        values = numpy.asarray( self.__value__ )
+        if( values.dtype.kind == "c" ):
+            dtype = numpy.complex128
+        else:
+            dtype = numpy.float64
+        if( self.__unit__ is unit or self.__unit__ == unit ):
+            return numpy.asarray( values, dtype=dtype )
+        if( not Quantity.__unitComparsion( self.__unit__, unit ) ):
+            raise qexceptions.ConversionException( unit, 
+                                                  " is not comparable to %s",
+                                                  self.__unit__ )
         
-        operator = self.__unit__.get_operator_to( unit )
+        operator = Quantity.__getOperator( self.__unit__, unit )
+        # the copy is converted in-place
+        values = numpy.array( values, dtype=dtype )
+        return operator.convert( values, values )
+    
+    def __getArrayPriority( self ):
+        """! @brief Get the priority of this instance in binary operations 
+              with instances of numpy.ndarray.
+              
+              Arrays defer binary operations to quantities holding arrays, 
+              so that the operation is performed on the whole value at once 
+              instead of creating a quantity for each element of the array.
+              @param self
+              @return The priority of this instance.
+        """
+        if( isinstance( self.__value__, numpy.ndarray ) ):
+            return Quantity.__ARRAY_PRIORITY
+        return Quantity.__SCALAR_PRIORITY
+    
+    ## The priority of quantities in operations with arrays, see 
+    #  Quantity.__getArrayPriority.
+    __array_priority__ = property( __getArrayPriority )
+    
+    def __valueIn( self, unit ):
+        """! @brief Helper method to get the value of this quantity in a 
+              unit that is known to be comparable.
+              
+              In contrast to Quantity.get_value, the units are not checked 
+              and no conversion is done if the units are equal.
+              @param self
+              @param unit A unit comparable to the unit of this quantity.
+              @return The value of this quantity expressed in the unit.
+        """
+        if( self.__unit__ is unit or self.__unit__ == unit ):
+            return self.__value__
+        operator = Quantity.__getOperator( self.__unit__, unit )
         return operator.convert( self.__value__ )
     
     def get_default_unit( self ):
@@ -184,7 +451,9 @@ class Quantity:
               @param self
               @return True, if the unit assigned is comparable to units.ONE.
         """
-        return self.__unit__.is_compatible( units.ONE )
+        unit = self.__unit__
+        # the dimension of the unit is cached per physical model
+        return ( unit is units.ONE or unit.is_compatible( units.ONE ) )
     
     #emulate numeric behaviour
     
@@ -197,14 +466,21 @@ class Quantity:
               @exception qexceptions.ConversionException If the units are not
                          comparable.
         """
-        assert(isinstance(other, Quantity))
+        # same unit, nothing to check or convert
+        if( self.__unit__ is other.__unit__ ):
+            result = self.__value__ + other.__value__
+            return Quantity.__make( self.__unit__, result )
         # check if the units are comparable
         if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
             raise qexceptions.ConversionException( other.__unit__, 
-                "is not compatible to "+str( self.__unit__ ) )
+                "is not compatible to %s", self.__unit__ )
         # get the other quantity in this unit
-        result = self.__value__ + other.get_value( self.__unit__ )
-        return Quantity( self.__unit__, result )
+        result = other.__valueIn( self.__unit__ )
+        if( Quantity.__isTemporary( result, other.__value__, self.__value__ ) ):
+            result = numpy.add( self.__value__, result, result )
+        else:
+            result = self.__value__ + result
+        return Quantity.__make( self.__unit__, result )
     
     def __sub__( self, other ):
         """! @brief Get the difference of another instance of Quantity and this instance.
@@ -215,7 +491,21 @@ class Quantity:
               @exception qexceptions.ConversionException If the units are not
                          comparable.
         """
-        return self.__add__( -other )
+        # same unit, nothing to check or convert
+        if( self.__unit__ is other.__unit__ ):
+            result = self.__value__ - other.__value__
+            return Quantity.__make( self.__unit__, result )
+        # check if the units are comparable
+        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
+            raise qexceptions.ConversionException( other.__unit__, 
+                "is not compatible to %s", self.__unit__ )
+        # get the other quantity in this unit
+        result = other.__valueIn( self.__unit__ )
+        if( Quantity.__isTemporary( result, other.__value__, self.__value__ ) ):
+            result = numpy.subtract( self.__value__, result, result )
+        else:
+            result = self.__value__ - result
+        return Quantity.__make( self.__unit__, result )
     
     def __mul__( self, other ):
         """! @brief Get the product of another instance of Quantity and this instance.
@@ -228,10 +518,9 @@ class Quantity:
               @return A new instance of Quantity representing the product of
                       both quantities.
         """
-        assert(isinstance(other, Quantity))
-        newUnit  = self.__unit__ * other.__unit__
+        newUnit  = Quantity.__multiplyUnits( self.__unit__, other.__unit__ )
         newValue = self.__value__ * other.__value__
-        return Quantity( newUnit, newValue )
+        return Quantity.__make( newUnit, newValue )
     
     def __pow__( self, other ):
         """! @brief Get the power of of this instance.
@@ -244,18 +533,16 @@ class Quantity:
                          is not dimensionless.
               @see units.Unit.__pow__
         """
-        assert(isinstance(other, Quantity))
         if( not Quantity.__unitComparsion( other.get_default_unit(), 
             units.ONE ) ):
             raise qexceptions.ConversionException( self.__unit__, 
                 "The argument is not comparable to a dimensionless "
-                +"quantity "
-                +str( other.__unit__ ) )
+                +"quantity %s", other.__unit__ )
         other   = other.__value__ 
         
         newValue = self.__value__ ** other
         newUnit  = self.__unit__ ** other
-        return Quantity( newUnit, newValue )
+        return Quantity.__make( newUnit, newValue )
     
     def __div__( self, other ):
         """! @brief Get the fraction of another instance of Quantity and this instance.
@@ -269,10 +556,9 @@ class Quantity:
               @return A new instance of Quantity representing the sum of
                       both quantities.
         """
-        assert(isinstance(other, Quantity))
-        newUnit  = self.__unit__ / other.__unit__
+        newUnit  = Quantity.__divideUnits( self.__unit__, other.__unit__ )
         newValue = self.__value__ / other.__value__
-        return Quantity( newUnit, newValue )
+        return Quantity.__make( newUnit, newValue )
     
     def __radd__( self, other ):
         """! @brief Get the sum of this instance of Quantity and another value.
@@ -295,15 +581,17 @@ class Quantity:
               @exception qexceptions.ConversionException If the units are not
                          comparable.
         """
-        # convert to a dimensionless type
-        assert(isinstance(other, Quantity))
         # check if the units are comparable
         if( not Quantity.__unitComparsion( self.__unit__, other.__unit__) ):
             raise qexceptions.ConversionException( other.__unit__, 
-                "is not compatible to "+str( self.__unit__ ) )
+                "is not compatible to %s", self.__unit__ )
         # get the other quantity in this unit
-        result = other.get_value( self.__unit__ ) - self.__value__
-        return Quantity( self.__unit__, result )
+        result = other.__valueIn( self.__unit__ )
+        if( Quantity.__isTemporary( result, other.__value__, self.__value__ ) ):
+            result = numpy.subtract( result, self.__value__, result )
+        else:
+            result = result - self.__value__
+        return Quantity.__make( self.__unit__, result )
     
     def __rmul__( self, other ):
         """! @brief Get the product of this instance of Quantity and another value.
@@ -313,10 +601,9 @@ class Quantity:
               @return A new instance of Quantity representing the product of
                       both quantities.
         """
-        assert(isinstance(other, Quantity))
         newValue = other.__value__ * self.__value__
-        newUnit  = other.__unit__ * self.__unit__
-        return Quantity( newUnit, newValue )
+        newUnit  = Quantity.__multiplyUnits( other.__unit__, self.__unit__ )
+        return Quantity.__make( newUnit, newValue )
     
     def __rdiv__( self, other ):
         """! @brief Get the fraction of another value and this instance.
@@ -328,8 +615,8 @@ class Quantity:
         """
         assert(isinstance( other, Quantity ) )
         newValue = other.__value__ / self.__value__
-        newUnit  = other.__unit__ / self.__unit__
-        return Quantity( newUnit, newValue )
+        newUnit  = Quantity.__divideUnits( other.__unit__, self.__unit__ )
+        return Quantity.__make( newUnit, newValue )
     
     def __rpow__( self, other ):
         """! @brief Get the power of another value and this instance.
@@ -342,7 +629,6 @@ class Quantity:
               @exception qexceptions.ConversionException If this unit is not
                          comparable to units.ONE.
         """
-        assert(isinstance(other, Quantity))
         if( not Quantity.__unitComparsion( self.__unit__, units.ONE) ):
             raise qexceptions.ConversionException( self, 
                                                   "this unit is not"+
@@ -356,11 +642,14 @@ class Quantity:
               @exception qexceptions.ConversionException If the units are not
                          comparable.
         """
-        assert(isinstance(other, Quantity))
-        result = self + other
-        # assign the values
-        self.__unit__  = result.__unit__
-        self.__value__ = result.__value__
+        # check if the units are comparable
+        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
+            raise qexceptions.ConversionException( other.__unit__, 
+                "is not compatible to %s", self.__unit__ )
+        # the value is replaced, not modified in place, since it may be
+        # shared with other quantities (e.g. arrays)
+        self.__value__ = Quantity.__accuracy( self.__value__ + 
+                                    other.__valueIn( self.__unit__ ) )
         return self
     
     def __isub__( self, other ):
@@ -370,11 +659,12 @@ class Quantity:
               @exception qexceptions.ConversionException If the units are not
                          comparable.
         """
-        assert(isinstance(other, Quantity))
-        result = self - other
-        # assign the values
-        self.__unit__  = result.__unit__
-        self.__value__ = result.__value__
+        # check if the units are comparable
+        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
+            raise qexceptions.ConversionException( other.__unit__, 
+                "is not compatible to %s", self.__unit__ )
+        self.__value__ = Quantity.__accuracy( self.__value__ - 
+                                    other.__valueIn( self.__unit__ ) )
         return self
     
     def __imul__( self, other ):
@@ -382,11 +672,11 @@ class Quantity:
               @param self
               @param other Another instance of Quantity or numeric value.
         """
-        assert(isinstance(other, Quantity))
-        result = self * other
-        # assign the values
-        self.__unit__    = result.__unit__
-        self.__value__   = result.__value__
+        newUnit          = Quantity.__multiplyUnits( self.__unit__, 
+                                                     other.__unit__ )
+        self.__value__   = Quantity.__accuracy( self.__value__ * 
+                                                other.__value__ )
+        self.__unit__    = newUnit
         return self
     
     def __idiv__( self, other ):
@@ -394,11 +684,11 @@ class Quantity:
               @param self
               @param other Another instance of Quantity or numeric value..
         """
-        assert(isinstance(other, Quantity))
-        result = self / other
-        # assign the values
-        self.__unit__    = result.__unit__
-        self.__value__   = result.__value__
+        newUnit          = Quantity.__divideUnits( self.__unit__, 
+                                                   other.__unit__ )
+        self.__value__   = Quantity.__accuracy( self.__value__ / 
+                                                other.__value__ )
+        self.__unit__    = newUnit
         return self
     
     def __ipow__( self, other ):
@@ -406,11 +696,15 @@ class Quantity:
               @param self
               @param other Another instance of Quantity or numeric value.
         """
-        assert(isinstance(other, Quantity))
-        result = self ** other
-        # assign the values
-        self.__unit__    = result.__unit__
-        self.__value__   = result.__value__
+        if( not Quantity.__unitComparsion( other.__unit__, units.ONE ) ):
+            raise qexceptions.ConversionException( self.__unit__, 
+                "The argument is not comparable to a dimensionless "
+                +"quantity %s", other.__unit__ )
+        other = other.__value__
+        # compute both before assigning, the unit may reject the power
+        newUnit          = self.__unit__ ** other
+        self.__value__   = Quantity.__accuracy( self.__value__ ** other )
+        self.__unit__    = newUnit
         return self
     
     def __neg__( self ):
@@ -419,21 +713,21 @@ class Quantity:
               @return A new instance of Quantity representing the negative of
                       this quantity.
         """
-        return Quantity( self.__unit__, -self.__value__)
+        return Quantity.__make( self.__unit__, -self.__value__)
     
     def __pos__( self ):
         """! @brief Copy this instance.
               @param self
               @return A copy of the current instance.
         """
-        return Quantity( self.__unit__, self.__value__)
+        return Quantity.__make( self.__unit__, self.__value__)
     
     def __abs__( self ):
         """! @brief Get the absolute value of this Quantity.
               @param self
               @return The absolute value of this quantity.
         """
-        return Quantity( self.__unit__, abs( self.__value__ ) )
+        return Quantity.__make( self.__unit__, abs( self.__value__ ) )
     
     def __invert__( self ):
         """! @brief Return the inverted instance of this Quantity.
@@ -442,7 +736,7 @@ class Quantity:
               @param self
               @return The inverted quantity.
         """
-        return Quantity( ~self.__unit__, ~self.__value__)
+        return Quantity.__make( ~self.__unit__, ~self.__value__)
     
     def __complex__( self ):
         """! @brief Cast this instance to the numeric type complex.
@@ -482,6 +776,32 @@ class Quantity:
                 "Only dimensionless quantities can be converted to float")
         return float( self.__value__ )
     
+    def __array__( self, dtype=None ):
+        """! @brief Cast this instance to numpy.ndarray.
+              
+              If no type of the elements is requested, the result is an 
+              array holding this quantity. Thus, sequences of quantities 
+              form arrays of quantities and the ufuncs of numpy 
+              still operate on quantities. Otherwise, quantities holding 
+              an array are converted to (complex) floating point at once, 
+              see Quantity.as_ndarray.
+              @attention All information about the unit used will be
+                         stripped from numeric results.
+              @attention This conversion is only possible, if weak consitency
+              checking is enabled or the quantity is dimensionless.
+              @param self
+              @param dtype The requested type of the elements.
+              @return An instance of numpy.ndarray.
+        """
+        if( dtype is not None and isinstance( self.__value__, numpy.ndarray ) ):
+            if( Quantity.is_strict() and not self.is_dimensionless() ):
+                raise qexceptions.ConversionException( self.__unit__,
+                    "Only dimensionless quantities can be converted to arrays" )
+            return numpy.asarray( self.as_ndarray( self.__unit__ ), dtype )
+        result = numpy.empty( (), dtype=object )
+        result[()] = self
+        return numpy.asarray( result, dtype )
+    
     def __int__( self ):
         """! @brief Cast this instance to the numeric type int.
               @attention All information about the unit used will be
@@ -503,6 +823,32 @@ class Quantity:
         """
         return str( self.__value__ )+" "+str( self.__unit__ )
     
+    def __compare( self, other, compare, incomparable=None ):
+        """! @brief Helper method to compare this instance to the argument.
+              @param self
+              @param other Another instance of Quantity or numeric value.
+              @param compare The function comparing the values 
+                             (e.g. operator.lt).
+              @param incomparable The result, if the units are not 
+                                  comparable. If it is None, an exception
+                                  is raised instead.
+              @return The result of the comparison of the values.
+              @exception qexceptions.ConversionException If the units are not
+                         comparable and no result is given for this case.
+        """
+        if(not isinstance(other, Quantity)):
+            a,b = coerce(self,other)
+            return compare( a, b )
+        # same unit, nothing to check or convert
+        if( self.__unit__ is other.__unit__ ):
+            return compare( self.__value__, other.__value__ )
+        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
+            if( incomparable is None ):
+                raise qexceptions.ConversionException( self, 
+                    " is not comparable to %s", other )
+            return incomparable
+        return compare( self.__value__, other.__valueIn( self.__unit__ ) )
+    
     def __lt__( self, other ):
         """! @brief Check, if this instance is less than the argument.
               A comparsion will be done, if the units are comparable.
@@ -512,15 +858,7 @@ class Quantity:
               @exception qexceptions.ConversionException If the units are not
                          comparable.
         """
-        if(not isinstance(other, Quantity)):
-            a,b = coerce(self,other)
-            return a < b
-        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__) ):
-            raise qexceptions.ConversionException( self, 
-                                                  " is not comparable to "
-                                                  +str( other ) )
-        otherValue = other.get_value( self.__unit__ )
-        return self.__value__ < otherValue
+        return self.__compare( other, operator.lt )
     
     def __le__( self, other ):
         """! @brief Check, if this instance is less or equal to the argument.
@@ -531,15 +869,7 @@ class Quantity:
               @exception qexceptions.ConversionException If the units are not
                          comparable.
         """
-        if(not isinstance(other, Quantity)):
-            a,b = coerce(self,other)
-            return a <= b
-        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
-            raise qexceptions.ConversionException( self, 
-                                                  " is not comparable to "
-                                                  +str( other ) )
-        otherValue = other.get_value( self.__unit__ )
-        return self.__value__ <= otherValue
+        return self.__compare( other, operator.le )
     
     def __eq__( self, other ):
         """! @brief Check, if this instance is equal to the argument.
@@ -554,10 +884,7 @@ class Quantity:
                 return a == b
             except NotImplementedError:
                 return False
-        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
-            return False
-        otherValue = other.get_value( self.__unit__ )
-        return self.__value__ == otherValue
+        return self.__compare( other, operator.eq, False )
     
     def __ne__( self, other ):
         """! @brief Check, if this instance is not equal to the argument.
@@ -566,13 +893,7 @@ class Quantity:
               @param other Another instance of Quantity.
               @return True, if this instance is not equal to the argument.
         """
-        if(not isinstance(other, Quantity)):
-            a,b = coerce(self,other)
-            return a != b
-        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
-            return True
-        otherValue = other.get_value( self.__unit__ )
-        return self.__value__ != otherValue
+        return self.__compare( other, operator.ne, True )
     
     def __gt__( self, other ):
         """! @brief Check, if this instance is greater than the argument.
@@ -583,15 +904,7 @@ class Quantity:
               @exception qexceptions.ConversionException If the units are not
                          comparable.
         """
-        if(not isinstance(other, Quantity)):
-            a,b = coerce(self,other)
-            return a > b
-        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
-            raise qexceptions.ConversionException( self, 
-                                                  " is not comparable to "
-                                                  +str( other ) )
-        otherValue = other.get_value( self.__unit__ )
-        return self.__value__ > otherValue
+        return self.__compare( other, operator.gt )
     
     def __ge__( self, other ):
         """! @brief Check, if this instance is greater or equal to the argument.
@@ -602,15 +915,7 @@ class Quantity:
               @exception qexceptions.ConversionException If the units are not
                          comparable.
         """
-        if(not isinstance(other, Quantity)):
-            a,b = coerce(self,other)
-            return a >= b
-        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
-            raise qexceptions.ConversionException( self, 
-                                                  " is not comparable to "
-                                                  +str( other ) )
-        otherValue = other.get_value( self.__unit__ )
-        return self.__value__ >= otherValue
+        return self.__compare( other, operator.ge )
     
     def __cmp__( self, other ):
         """! @brief Compare two instances of quantity.
@@ -627,20 +932,19 @@ class Quantity:
             return cmp(a,b)
         if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
             raise qexceptions.ConversionException( self, 
-                                                  " is not comparable to "
-                                                  +str( other ) )
-        if( self < other ):
-            return -1
-        if( self > other ):
-            return 1
-        if( self == other ):
-            return 0
-        # this should not happen
-        assert( 0 )
+                                                  " is not comparable to %s",
+                                                  other )
+        selfValue  = self.__value__
+        otherValue = other.__valueIn( self.__unit__ )
+        return ( selfValue > otherValue ) - ( selfValue < otherValue )
         
     def __getstate__( self ):
         """! @brief
                Serialization using pickle.
+              @note The unit is stored as object. Thus, pickle stores a 
+                    unit shared by several quantities only once per 
+                    pickled object and the unpickled quantities share
+                    the unit again.
               @param self
               @return A string that represents the serialized form
                       of this instance.
@@ -667,29 +971,137 @@ class Quantity:
         """
         if( isinstance( other, Quantity ) ):
             return other
-        assert( operator.isNumberType( other ) or 
-                operator.isSequenceType( other ) or
-                isinstance( other, ucomponents.UncertainInput ) )
-        assert( not isinstance( other, units.Unit ) )
+        assert( isinstance( other, _VALUE_TYPES ) or
+                ( ( operator.isNumberType( other ) or 
+                    operator.isSequenceType( other ) ) and
+                  not isinstance( other, units.Unit ) ) )
         
         # Create a dimensionless quantity having the 
-        # argument as value.
-        return Quantity( units.ONE, other )
+        # argument as value, the argument has been checked above.
+        return Quantity.__make( units.ONE, Quantity.__accuracy( other ) )
     value_of = staticmethod( value_of )
     
+    ## Types tried for the elements of arrays created by array_of.
+    __ARRAY_TYPES = ( numpy.float64, numpy.complex128 )
+    
+    def array_of( sequence, unit=None ):
+        """! @brief Factory for generating a quantity holding an array.
+              
+              Instead of an array of quantities, the result stores a 
+              single unit and an instance of numpy.ndarray holding the 
+              values. Thus, the units are checked once per operation 
+              and the values are processed by the ufuncs of numpy.
+              @param sequence A sequence or an array of quantities or 
+                              numeric values.
+              @param unit The unit of the result. By default, the unit
+                          of the first element is used.
+              @return A Quantity holding an array shaped like the sequence.
+              @exception qexceptions.ConversionException If the elements 
+                         are not comparable to the unit.
+        """
+        items = numpy.asarray( sequence, dtype=object )
+        if( unit is None ):
+            assert( items.size > 0 )
+            unit = Quantity.value_of( items.flat[0] ).__unit__
+        
+        values = [ Quantity.value_of( item ).get_value( unit ) 
+                   for item in items.flat ]
+        array = numpy.array( values )
+        # integers are converted to rational numbers by get_value,
+        # values having no floating point representation are kept
+        for dtype in Quantity.__ARRAY_TYPES:
+            if( array.dtype.kind in "fc" ):
+                break
+            try:
+                array = numpy.array( values, dtype=dtype )
+            except ( TypeError, ValueError, AttributeError ):
+                pass
+        values = array.reshape( items.shape + array.shape[1:] )
+        return Quantity( unit, values )
+    array_of = staticmethod( array_of )
+    
+    def from_array( unit, values ):
+        """! @brief Factory for generating a quantity holding an array of
+              values in the given unit.
+              
+              In contrast to Quantity.array_of, the elements are not 
+              checked or converted one by one. An instance of 
+              numpy.ndarray is used without copying it.
+              @param unit The unit of the values.
+              @param values An array or a sequence of numeric values.
+              @return A Quantity holding the values as numpy.ndarray.
+        """
+        assert( isinstance( unit, units.Unit ) )
+        return Quantity.__make( unit, numpy.asarray( values ) )
+    from_array = staticmethod( from_array )
+    
     def __accuracy( value ):
         """! @brief Helper method, to increase the accuracy of integer operations.
               As soon an int or long is provided, it is converted to a
               rational number.
               @param value The value to be converted.
         """
-        if( isinstance( value, int ) or isinstance( value, long ) ):
+        if( value.__class__ in Quantity.__EXACT_TYPES ):
+            return value
+        if( isinstance( value, _INT_TYPES ) ):
+            if( -5 <= value < 257 ):
+                return _SMALL_RATIONALS[value + 5]
             return arithmetic.RationalNumber( value, 1 )
         else:
             return value
     __accuracy = staticmethod( __accuracy )
     
     #Support for numpy
+    # The ufuncs of numpy treat quantities as objects and call the method
+    # of the same name. For a quantity holding an array, the method is
+    # called once and applies the ufunc to the whole array. Classic classes
+    # cannot implement __array_ufunc__, numpy looks it up on the type.
+    
+    def __applyDimensionless( self, ufunc ):
+        """! @brief Helper method to apply a ufunc of numpy that requires
+              a dimensionless argument.
+              @param self
+              @param ufunc The ufunc to apply (e.g. numpy.sin).
+              @return A dimensionless quantity holding the result.
+              @exception qexceptions.NotDimensionlessException 
+                         If the unit assigned is not dimensionless.
+        """
+        # most dimensionless quantities have the unit ONE
+        if( self.__unit__ is not units.ONE and not self.is_dimensionless() ):
+            raise( qexceptions.NotDimensionlessException( 
+                    self.get_default_unit(), 
+                    "Unit is not dimensionless " ) )
+        
+        value = self.__value__
+        if( value.__class__ is float ):
+            function = _SCALAR_UFUNCS.get( ufunc )
+            if( function is not None ):
+                try:
+                    # same type of the result as returned by numpy
+                    return Quantity.__make( units.ONE, 
+                                            _float64( function( value ) ) )
+                except ( ValueError, OverflowError ):
+                    # numpy returns nan or inf instead
+                    pass
+        return Quantity.__make( units.ONE, ufunc( value ) )
+    
+    def __applyUnary( self, ufunc, unit, out ):
+        """! @brief Helper method to apply a unary ufunc of numpy.
+              @param self
+              @param ufunc The ufunc to apply (e.g. numpy.fabs).
+              @param unit The unit of the result.
+              @param out A quantity holding an array to store the result
+                         in, or None to create a new quantity. It may be 
+                         this quantity.
+              @return The quantity holding the result.
+        """
+        if( out is None ):
+            return Quantity.__make( unit, ufunc( self.__value__ ) )
+        
+        assert( isinstance( out, Quantity ) )
+        out.__value__ = ufunc( self.__value__, out.__value__ )
+        out.__unit__  = unit
+        return out
     
     def arccos( self ):
         """! @brief This method provides the broadcast interface for
@@ -699,14 +1111,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.arccos( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.arccos )
     
     def arccosh( self ):
         """! @brief This method provides the broadcast interface for
@@ -716,14 +1121,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.arccosh( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.arccosh )
     
     def arcsin( self ):
         """! @brief This method provides the broadcast interface for
@@ -733,14 +1131,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.arcsin( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.arcsin )
     
     def arcsinh( self ):
         """! @brief This method provides the broadcast interface for
@@ -750,14 +1141,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.arcsinh( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.arcsinh )
     
     def arctan( self ):
         """! @brief This method provides the broadcast interface for
@@ -767,14 +1151,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.arctan( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.arctan )
     
     def arctanh( self ):
         """! @brief This method provides the broadcast interface for
@@ -784,14 +1161,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.arctanh( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.arctanh )
     
     def cos( self ):
         """! @brief This method provides the broadcast interface for
@@ -801,14 +1171,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.cos( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.cos )
     
     def cosh( self ):
         """! @brief This method provides the broadcast interface for
@@ -818,14 +1181,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.cosh( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.cosh )
     
     def tan( self ):
         """! @brief This method provides the broadcast interface for
@@ -835,14 +1191,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.tan( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.tan )
     
     def tanh( self ):
         """! @brief This method provides the broadcast interface for
@@ -852,14 +1201,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.tanh( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.tanh )
     
     def log10( self ):
         """! @brief This method provides the broadcast interface for
@@ -869,14 +1211,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.log10( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.log10 )
     
     def log2( self ):
         """! @brief This method provides the broadcast interface for
@@ -886,14 +1221,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.log2( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.log2 )
     
     def sin( self ):
         """! @brief This method provides the broadcast interface for
@@ -903,14 +1231,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.sin( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.sin )
     
     def sinh( self ):
         """! @brief This method provides the broadcast interface for
@@ -920,64 +1241,62 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.sinh( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.sinh )
     
-    def sqrt( self ):
+    def sqrt( self, out=None ):
         """! @brief This method provides the broadcast interface for
               numpy.sqrt.
               @param self
+              @param out A quantity holding an array to store the result
+                         in (optional).
               @return The Square Root of this quantity.
         """
-        value = numpy.sqrt( self.__value__ )
-        unit  = numpy.sqrt( self.__unit__ )
+        unit = Quantity.__lookupUnary( Quantity.__SQUARE_ROOTS, 
+                                       self.__unit__, numpy.sqrt )
         
-        return Quantity( unit, value )
+        return self.__applyUnary( numpy.sqrt, unit, out )
     
     def square( self ):
         """! @brief This method provides the broadcast interface for
-              numpy.sqrt.
+              numpy.square.
               @param self
-              @return The Square Root of this quantity.
+              @return The Square of this quantity.
         """
-        return self*self
+        value = self.__value__ * self.__value__
+        unit  = Quantity.__multiplyUnits( self.__unit__, self.__unit__ )
+        
+        return Quantity.__make( unit, value )
     
-    def fabs( self ):
+    def fabs( self, out=None ):
         """! @brief This method provides the broadcast interface for
               numpy.fabs.
               @param self
+              @param out A quantity holding an array to store the result
+                         in (optional).
               @return The absolute value of this quantity.
         """
-        value = numpy.fabs( self.__value__ )
-
-        return Quantity( self.__unit__, value )
+        return self.__applyUnary( numpy.fabs, self.__unit__, out )
     
-    def floor( self ):
+    def floor( self, out=None ):
         """! @brief This method provides the broadcast interface for
               numpy.floor.
               @param self
+              @param out A quantity holding an array to store the result
+                         in (optional).
               @return The largest integer less than or equal to this quantity.
         """
-        value = numpy.floor( self.__value__ )
-
-        return Quantity( self.__unit__, value )
+        return self.__applyUnary( numpy.floor, self.__unit__, out )
     
-    def ceil( self ):
+    def ceil( self, out=None ):
         """! @brief This method provides the broadcast interface for
               numpy.ceil.
               @param self
+              @param out A quantity holding an array to store the result
+                         in (optional).
               @return The largest integer greater than or equal to this 
                       quantity.
         """
-        value = numpy.ceil( self.__value__ )
-
-        return Quantity( self.__unit__, value )
+        return self.__applyUnary( numpy.ceil, self.__unit__, out )
     
     def exp( self ):
         """! @brief This method provides the broadcast interface for
@@ -987,14 +1306,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-
-        value = numpy.exp( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.exp )
     
     def log( self ):
         """! @brief This method provides the broadcast interface for
@@ -1004,14 +1316,7 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if( not self.is_dimensionless() ):
-            raise( qexceptions.NotDimensionlessException( 
-                    self.get_default_unit(), 
-                    "Unit is not dimensionless " ) )
-                    
-        value = numpy.log( self.__value__ )
-
-        return Quantity( units.ONE, value )
+        return self.__applyDimensionless( numpy.log )
     
     def arctan2( self, other ):
         """! @brief This method provides the broadcast interface for
@@ -1022,42 +1327,49 @@ class Quantity:
               @exception qexceptions.NotDimensionlessException 
                          If the unit assigned is not dimensionless.
         """
-        if(not isinstance(other, Quantity)):
-            tmp,other = coerce(self,other)
-            return numpy.arctan2(tmp, other)
-        assert(isinstance(other, Quantity))
+        other = Quantity.value_of( other )
         if( not (self.is_dimensionless() or other.is_dimensionless())):
             raise( qexceptions.NotDimensionlessException( 
                     self.get_default_unit(), 
                     "Units are not dimensionless " ) )
         
-        other_val = other.get_value(other.get_default_unit())
-        value = numpy.arctan2( self.__value__, other_val )
+        value = numpy.arctan2( self.__value__, other.__value__ )
 
-        return Quantity( units.ONE, value )
+        return Quantity.__make( units.ONE, value )
     
     def hypot(self, other):
         """! @brief This method provides the broadcast interface for
-              numpy.arctan2.
+              numpy.hypot.
               @param self
               @param other Another instance of Quantity.
               @return The hypothenusis of the arguments.
+              @exception qexceptions.ConversionException If the units are not
+                         comparable.
         """
-        if(not isinstance(other, Quantity)):
-            tmp,other = coerce(self,other)
-            return numpy.hypot(tmp, other)
-        assert(isinstance(other, Quantity))
-        return numpy.sqrt(self*self + other*other)
+        other = Quantity.value_of( other )
+        # same unit, nothing to check or convert
+        if( self.__unit__ is other.__unit__ ):
+            value = numpy.hypot( self.__value__, other.__value__ )
+            return Quantity.__make( self.__unit__, value )
+        if( not Quantity.__unitComparsion( self.__unit__, other.__unit__ ) ):
+            raise qexceptions.ConversionException( other.__unit__, 
+                "is not compatible to %s", self.__unit__ )
+        value = other.__valueIn( self.__unit__ )
+        if( Quantity.__isTemporary( value, other.__value__, self.__value__ ) ):
+            value = numpy.hypot( self.__value__, value, value )
+        else:
+            value = numpy.hypot( self.__value__, value )
+        return Quantity.__make( self.__unit__, value )
     
-    def conjugate( self ):
+    def conjugate( self, out=None ):
         """! @brief This method provides the broadcast interface for
               numpy.conjugate.
               @param self
+              @param out A quantity holding an array to store the result
+                         in (optional).
               @return This quantity.
         """
-        value = numpy.conjugate( self.__value__ )
-
-        return Quantity( self.__unit__, value )
+        return self.__applyUnary( numpy.conjugate, self.__unit__, out )
     
     def set_strict(bValue = True):
         """! @brief Turn on/off the strict evaluation of quantities. This will 
@@ -1082,19 +1394,23 @@ class Quantity:
     def __coerce__(self, other):
         """! @brief Implementation of coercion rules.
         \see Coercion - The page describing the coercion rules."""
+        # exact types first, this is called for each binary operation
+        if(other.__class__ is Quantity):
+            return (self, other)
+        if(other.__class__ in _NUMERIC_TYPES):
+            other = Quantity.__make(units.ONE, Quantity.__accuracy(other))
+            return (self, other)
         if(isinstance(other, Quantity)):
             return (self, other)
-        elif(isinstance(other, int) or
-             isinstance(other, long) or
-             isinstance(other, float) or
-             isinstance(other, complex) or
-             isinstance(other, arithmetic.RationalNumber)):
+        elif(isinstance(other, _NUMERIC_TYPES)):
             other = Quantity.value_of(other)
             return (self,other)
         elif(isinstance(other, numpy.ndarray)):
-            if(other.dtype == Quantity):
+            if(other.dtype == object):
                 raise NotImplementedError("Cannot encapsulate ndarrays of"
                                          +"quantities in quantities")
+            other = Quantity.value_of(other)
+            return (self,other)
         else:
             raise NotImplementedError()
         
@@ -26,7 +26,6 @@
 
 # standard modules
 import locale
-import string
 import sys
 
 # local modules
@@ -46,11 +45,14 @@ class SIModel( units.PhysicalModel ):
         """
         return None
 
-    def get_dimension( self, unit ):
+    def get_dimension( self, unit, default=None ):
         """! @brief Get the pysical dimension that corresponds to the
                given SI base unit.
                @param  self
                @param  unit The unit to check the dimension for.
+               @param  default The value to return if the unit is no
+                       SI base unit (e.g. qexceptions.UNKNOWN_UNIT). By
+                       default an exception is raised instead.
                @exception qexceptions.UnknownUnitException If the given 
                           parameter is no SI base unit.
                @return The corresponding physical dimension.
@@ -71,15 +73,36 @@ class SIModel( units.PhysicalModel ):
             return units.TEMPERATURE
         # This should not happen, since we assume that only SI
         # units are used.
-        raise qexceptions.UnknownUnitException( "The unit is no SI-unit ", 
-                                                unit )
-
-# Check if unicode is enabled (i.e. if the symbols are shown correctly)
-language, encoding = locale.getdefaultlocale()
-if( string.lower( encoding ) != "utf-8" ):
-    sys.stderr.write( "You should use UTF-8 instead of "+encoding
-                      +" as encoding, or the "
-                      +"SI units won't display correctly\n" )
+        if( default is not None ):
+            return default
+        raise qexceptions.UnknownUnitException( unit, 
+                                                   "The unit is no SI-unit" )
+
+## True, if the encoding has already been checked.
+__encodingChecked = False
+
+def check_encoding():
+    """! @brief Check if unicode is enabled (i.e. if the symbols are shown 
+          correctly).
+          
+          A warning is written to stderr if the preferred encoding is not
+          UTF-8. The encoding is checked on the first call only.
+    """
+    global __encodingChecked
+    if( __encodingChecked ):
+        return
+    __encodingChecked = True
+    encoding = locale.getpreferredencoding( False )
+    if( encoding.lower().replace( "-", "" ) != "utf8" ):
+        sys.stderr.write( "You should use UTF-8 instead of "+encoding
+                          +" as encoding, or the "
+                          +"SI units won't display correctly\n" )
+
+# the encoding is checked once the Ohm is displayed for the first time
+units.set_encoding_check( check_encoding )
+
+## The <tt>UTF-8</tt> encoded symbol \f$\Omega\f$ of the SI unit Ohm.
+__OHM_SYMBOL = "\xce\xa9"
 
 ## Unit instance to model the BaseUnit Ampere.
 AMPERE   = units.BaseUnit( "A" )
@@ -140,8 +163,7 @@ FARAD       = units.AlternateUnit( "F", COULOMB / VOLT )
 
 ## Unit instance to model the SI unit Ohm.
 # \note The <tt>UTF-8</tt> encoded string stands for \f$\Omega\f$.
-OHM         = units.AlternateUnit( ( u"\u03A9" ).encode( "UTF-8" ), 
-                                   VOLT / AMPERE )
+OHM         = units.AlternateUnit( __OHM_SYMBOL, VOLT / AMPERE )
 
 ## Unit instance to model the SI unit Siemens.
 SIEMENS     = units.AlternateUnit( "S", AMPERE / VOLT )
@@ -16,9 +16,15 @@
 # @{
 
 # standard modules
+import locale
 import numpy
 import operator
-import pickle
+import pickletools
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+import StringIO
 import types
 import unittest
 import sys
@@ -60,22 +66,21 @@ def test_serialization( instance, copy, sanityInstance, type, bCopy=True ):
     # If False is returned, the object can not be
     # serialized
     assert( instance.__getstate__() != False )
+    # Same thing for the sanity Object
+    assert( sanityInstance.__getstate__() != False )
     
     # check the serialization using all available protocols
     for i in range( 0, pickle.HIGHEST_PROTOCOL+1 ):
-        # serialize the object
-        someString = pickle.dumps( instance )
-        # is the result really a string?
-        assert( someString != None )
-        assert( len( someString ) > 0 )
+        # serialize the object, without unused memo entries
+        someString = pickletools.optimize( pickle.dumps( instance, i ) )
+        # is the result really a non-empty string?
+        assert( someString )
         
-        # Same thing for the sanity Object
-        assert( sanityInstance.__getstate__() != False )
-        # serialize the object
-        sanityString = pickle.dumps( sanityInstance )
-        # is the result really a string?
-        assert( sanityString != None )
-        assert( len( sanityString ) > 0 )
+        # serialize the sanity object, without unused memo entries
+        sanityString = pickletools.optimize( pickle.dumps( sanityInstance, 
+                                                           i ) )
+        # is the result really a non-empty string?
+        assert( sanityString )
         
         # assert different code
         assert( sanityString != someString )
@@ -139,6 +144,14 @@ class TestSIUnits( unittest.TestCase ):
         operator = ~operator
         result   = operator.convert( valueTransformed )
         assert( abs( result - valueParent ) < maxAcceptableError )
+        # convert both values back and forth at once
+        values   = numpy.array( [valueParent, valueTransformed] )
+        operator = unit.to_parent_unit()
+        result   = operator.convert( values )
+        assert( abs( result[0] - valueTransformed ) < maxAcceptableError )
+        operator = ~operator
+        result   = operator.convert( result )
+        assert( numpy.all( abs( result - values ) < maxAcceptableError ) )
         # Test serialization (using no copy, since the unit needs 
         # to be unique)
         test_serialization( unit, None, parent, units.TransformedUnit, False )
@@ -171,32 +184,34 @@ class TestSIUnits( unittest.TestCase ):
               @param self
               @see BASE_UNIT_TEST
         """
-        TestSIUnits.BASE_UNIT_TEST( si.AMPERE, units.CURRENT, units.ONE, "A", 
-                                  units.NONE )
-        TestSIUnits.BASE_UNIT_TEST( si.CANDELA, units.LUMINOUS_INTENSITY, 
-                                  si.AMPERE, "cd", units.CURRENT )
-        TestSIUnits.BASE_UNIT_TEST( si.KELVIN, units.TEMPERATURE, si.AMPERE, 
-                                  "K", units.CURRENT )
-        TestSIUnits.BASE_UNIT_TEST( si.KILOGRAM, units.MASS, si.AMPERE, "kg", 
-                                  units.CURRENT )
-        TestSIUnits.BASE_UNIT_TEST( si.METER, units.LENGTH, si.AMPERE, "m", 
-                                  units.CURRENT )
-        TestSIUnits.BASE_UNIT_TEST( si.MOLE, units.SUBSTANCE, si.AMPERE, 
-				                            "mol", units.CURRENT )
-        TestSIUnits.BASE_UNIT_TEST( si.SECOND, units.TIME, si.AMPERE, "s", 
-                                  units.CURRENT )
+        # unit, dimension, idiotsUnit, symbol, idiotsDimension
+        table = ( ( si.AMPERE, units.CURRENT, units.ONE, "A", units.NONE ),
+                  ( si.CANDELA, units.LUMINOUS_INTENSITY, si.AMPERE, "cd", 
+                    units.CURRENT ),
+                  ( si.KELVIN, units.TEMPERATURE, si.AMPERE, "K", 
+                    units.CURRENT ),
+                  ( si.KILOGRAM, units.MASS, si.AMPERE, "kg", units.CURRENT ),
+                  ( si.METER, units.LENGTH, si.AMPERE, "m", units.CURRENT ),
+                  ( si.MOLE, units.SUBSTANCE, si.AMPERE, "mol", 
+                    units.CURRENT ),
+                  ( si.SECOND, units.TIME, si.AMPERE, "s", units.CURRENT ) )
+        for row in table:
+            TestSIUnits.BASE_UNIT_TEST( *row )
     
     def test_alternate_units( self ):
         """! @brief Test the alternate SI units.
               @param self
               @see ALTERNATE_TEST
         """
+        # units used by several parent units
+        squareMeter = si.METER ** 2
+        grayParent  = si.JOULE / si.KILOGRAM
         TestSIUnits.ALTERNATE_TEST( si.RADIAN, units.ONE, si.AMPERE, "rad" )
         TestSIUnits.ALTERNATE_TEST( si.STERADIAN, units.ONE, si.AMPERE, "sr" )
         TestSIUnits.ALTERNATE_TEST( si.NEWTON, 
                                    si.KILOGRAM * si.METER/( si.SECOND ** 2 ), 
                                    si.AMPERE, "N" )
-        TestSIUnits.ALTERNATE_TEST( si.PASCAL, si.NEWTON / ( si.METER ** 2 ), 
+        TestSIUnits.ALTERNATE_TEST( si.PASCAL, si.NEWTON / squareMeter, 
                                    si.AMPERE, "Pa" )
         TestSIUnits.ALTERNATE_TEST( si.JOULE, si.NEWTON * si.METER, 
                                    si.AMPERE, "J" )
@@ -208,32 +223,60 @@ class TestSIUnits( unittest.TestCase ):
                                    si.AMPERE, "V" )
         TestSIUnits.ALTERNATE_TEST( si.FARAD, si.COULOMB / si.VOLT, 
                                    si.AMPERE, "F" )
-        __omega = u"\u03A9"
-        __encoded = __omega.encode( "UTF-8" )
+        # the symbol is the UTF-8 encoded Omega
         TestSIUnits.ALTERNATE_TEST( si.OHM, si.VOLT / si.AMPERE, 
-                                   si.AMPERE, __encoded )
+                                   si.AMPERE, u"\u03A9".encode( "UTF-8" ) )
+        # the encoding is checked once, when the Ohm is displayed first
+        getEncoding = locale.getpreferredencoding
+        stderr = sys.stderr
+        try:
+            locale.getpreferredencoding = lambda doSetLocale=True: "ASCII"
+            sys.stderr = StringIO.StringIO()
+            setattr( si, "__encodingChecked", False )
+            units.set_encoding_check( si.check_encoding )
+            str( si.VOLT )
+            assert( sys.stderr.getvalue() == "" )
+            str( si.OHM )
+            str( si.OHM )
+            str( si.OHM * si.AMPERE )
+            si.check_encoding()
+            assert( sys.stderr.getvalue().count( "ASCII" ) == 1 )
+        finally:
+            locale.getpreferredencoding = getEncoding
+            sys.stderr = stderr
         TestSIUnits.ALTERNATE_TEST( si.SIEMENS, si.AMPERE / si.VOLT, 
                                    si.AMPERE, "S" )
         TestSIUnits.ALTERNATE_TEST( si.WEBER, si.VOLT * si.SECOND, 
                                    si.AMPERE, "Wb" )
-        TestSIUnits.ALTERNATE_TEST( si.TESLA, si.WEBER / ( si.METER ** 2 ), 
+        TestSIUnits.ALTERNATE_TEST( si.TESLA, si.WEBER / squareMeter, 
                                    si.AMPERE, "T" )
         TestSIUnits.ALTERNATE_TEST( si.HENRY, si.WEBER / si.AMPERE, 
                                    si.AMPERE, "H" )
         TestSIUnits.ALTERNATE_TEST( si.LUMEN, si.CANDELA * si.STERADIAN, 
                                    si.AMPERE, "lm" )
-        TestSIUnits.ALTERNATE_TEST( si.LUX, si.LUMEN / ( si.METER**2 ), 
+        TestSIUnits.ALTERNATE_TEST( si.LUX, si.LUMEN / squareMeter, 
                                    si.AMPERE, "lx" )
         TestSIUnits.ALTERNATE_TEST( si.BECQUEREL, ~si.SECOND, 
                                    si.AMPERE, "Bq" )
-        TestSIUnits.ALTERNATE_TEST( si.GRAY, si.JOULE / si.KILOGRAM, 
+        TestSIUnits.ALTERNATE_TEST( si.GRAY, grayParent, 
                                    si.AMPERE, "Gy" )
-        TestSIUnits.ALTERNATE_TEST( si.SIVERT, si.JOULE / si.KILOGRAM, 
+        TestSIUnits.ALTERNATE_TEST( si.SIVERT, grayParent, 
                                    si.AMPERE, "Sv" )
         TestSIUnits.ALTERNATE_TEST( si.KATAL, si.MOLE / si.SECOND, 
                                    si.AMPERE, "kat" )
         assert( si.KATAL != si.AMPERE )
         
+        # the dimension is derived once per physical model
+        dimension = si.NEWTON.get_dimension()
+        assert( si.NEWTON.get_dimension() is dimension )
+        model = units.get_default_model()
+        units.set_default_model( si.SIModel() )
+        try:
+            assert( si.NEWTON.get_dimension() is not dimension )
+            assert( si.NEWTON.get_dimension() == dimension )
+        finally:
+            units.set_default_model( model )
+        
     def test_transformed_units( self ):
         """! @brief Test the transformed SI units (i.e. there is only one: degrees Celsius)
               @param self
@@ -249,15 +292,44 @@ class TestSIUnits( unittest.TestCase ):
         result = si.AMPERE ** arithmetic.RationalNumber( 2, 1 )
         assert( result == si.AMPERE ** 2 )
         
+        expected = si.AMPERE ** arithmetic.RationalNumber(3,2)
         result = numpy.sqrt(si.AMPERE)*si.AMPERE
-        assert(result == si.AMPERE ** arithmetic.RationalNumber(3,2))
+        assert(result == expected)
         
         result = si.AMPERE*numpy.sqrt(si.AMPERE)
-        assert(result == si.AMPERE ** arithmetic.RationalNumber(3,2))
+        assert(result == expected)
+        
+        # integer powers
+        speed = si.METER / si.SECOND
+        result = speed ** 7
+        assert( result == speed * speed * speed * speed * speed * speed * 
+                          speed )
+        assert( str( result ) == "m^(7)*s^(-7)" )
+        assert( speed ** -3 == ~( speed * speed * speed ) )
         
 class TestArithmetic( unittest.TestCase ):
     """! @brief       This class provides the tests to verify the rational number module.
     """
+    
+    def setUp( self ):
+        """! @brief This method initializes this test instance.
+              @param self
+        """
+        self.firstVal  = arithmetic.RationalNumber( 4, 3 )   # 1/1/3
+        self.secondVal = arithmetic.RationalNumber( 5, 10 )  # 1/2
+    
+    def test_gcd( self ):
+        """! @brief Test the greatest common divisor of integers.
+              @param self
+        """
+        assert( arithmetic.gcd( 12, 18 ) == 6L )
+        assert( arithmetic.gcd( 18, 12 ) == 6L )
+        assert( arithmetic.gcd( 7, 0 ) == 7L )
+        assert( arithmetic.gcd( 0, 7 ) == 7L )
+        assert( arithmetic.gcd( 1, 1 ) == 1L )
+        assert( arithmetic.gcd( 2**100 * 3, 2**90 * 9 ) == 2**90 * 3 )
+        assert( isinstance( arithmetic.gcd( 4, 2 ), long ) )
+        
     def test_rational_creation( self ):
         """! @brief Test the creation of the Type arithmetic.RationalNumber.
               @param self
@@ -272,6 +344,16 @@ class TestArithmetic( unittest.TestCase ):
         number = arithmetic.RationalNumber( 2, -4 )
         assert( number.get_dividend() == -1L )
         assert( number.get_divisor() == 2L )
+        # the same normalization again, and with another sign
+        number = arithmetic.RationalNumber( 2, -4 )
+        assert( number.get_dividend() == -1L )
+        assert( number.get_divisor() == 2L )
+        number = arithmetic.RationalNumber( -2, 4 )
+        assert( number.get_dividend() == -1L )
+        assert( number.get_divisor() == 2L )
+        number = arithmetic.RationalNumber( 0, 4 )
+        assert( number.get_dividend() == 0L )
+        assert( number.get_divisor() == 1L )
         
         # Test for divide by zero
         error = False
@@ -309,8 +391,8 @@ class TestArithmetic( unittest.TestCase ):
         """! @brief Test adding instances of the Type arithmetic.RationalNumber.
               @param self
         """
-        firstVal = arithmetic.RationalNumber( 4, 3 )   # 1/1/3
-        secondVal = arithmetic.RationalNumber( 5, 10 ) # 1/2
+        firstVal  = self.firstVal
+        secondVal = self.secondVal
         
         # addition of RationalNumbers
         result = firstVal + secondVal
@@ -323,6 +405,13 @@ class TestArithmetic( unittest.TestCase ):
         assert( secondVal.get_dividend() == 1L )
         assert( secondVal.get_divisor() == 2L )
         
+        # addition of integers
+        result = arithmetic.RationalNumber( 3 ) + arithmetic.RationalNumber( 4 )
+        assert( isinstance( result, arithmetic.RationalNumber ) )
+        assert( result.get_dividend() == 7L )
+        assert( result.get_divisor()  == 1L )
+        assert( result == arithmetic.RationalNumber( 14, 2 ) )
+        
         # addition of integer
         result = firstVal + 1
         assert( isinstance( result, arithmetic.RationalNumber ) )
@@ -357,8 +446,8 @@ class TestArithmetic( unittest.TestCase ):
         """! @brief Test substracting instances of the Type arithmetic.RationalNumber.
               @param self
         """
-        firstVal = arithmetic.RationalNumber( 4, 3 )   # 1/1/3
-        secondVal = arithmetic.RationalNumber( 5, 10 ) # 1/2
+        firstVal  = self.firstVal
+        secondVal = self.secondVal
         
         # substraction of RationalNumbers
         result = firstVal - secondVal
@@ -405,8 +494,8 @@ class TestArithmetic( unittest.TestCase ):
         """! @brief Test multiplying instances of the Type arithmetic.RationalNumber.
               @param self
         """
-        firstVal = arithmetic.RationalNumber( 4, 3 )   # 1/1/3
-        secondVal = arithmetic.RationalNumber( 5, 10 ) # 1/2
+        firstVal  = self.firstVal
+        secondVal = self.secondVal
         
         # multiplication of RationalNumbers
         result = firstVal * secondVal
@@ -502,8 +591,8 @@ class TestArithmetic( unittest.TestCase ):
         """! @brief Test dividing instances of the Type arithmetic.RationalNumber.
               @param self
         """
-        firstVal = arithmetic.RationalNumber( 4, 3 )   # 1/1/3
-        secondVal = arithmetic.RationalNumber( 5, 10 ) # 1/2
+        firstVal  = self.firstVal
+        secondVal = self.secondVal
         
         # division of RationalNumbers
         result = firstVal / secondVal
@@ -675,6 +764,12 @@ class TestArithmetic( unittest.TestCase ):
         assert( firstVal.get_dividend() == 4L )
         assert( firstVal.get_divisor() == 3L )
         
+        # the divisor stays positive
+        result   = ~arithmetic.RationalNumber( -4, 3 )
+        assert( result.get_dividend() == -3L )
+        assert( result.get_divisor() == 4L )
+        assert( result == arithmetic.RationalNumber( 3, -4 ) )
+        
         # test for divide by zero
         secondVal = arithmetic.RationalNumber( 0, 3 )   # 1/1/3
         assert( secondVal.get_dividend() == 0L )
@@ -690,24 +785,27 @@ class TestArithmetic( unittest.TestCase ):
         """! @brief Test the comparision functions of rational numbers.
               @param self
         """
+        # values compared to several times
+        fourThirds = arithmetic.RationalNumber( 4, 3 )
+        half       = arithmetic.RationalNumber( 1, 2 )
         firstVal = arithmetic.RationalNumber( 4, 3 )   # 1/1/3
         secondVal = arithmetic.RationalNumber( 5, 10 ) # 1/2
         assert( firstVal != secondVal ) # __eq__
-        assert( firstVal == arithmetic.RationalNumber( 4, 3 ) ) # __eq__
-        assert( secondVal == arithmetic.RationalNumber( 1, 2 ) ) # __eq__
+        assert( firstVal == fourThirds ) # __eq__
+        assert( secondVal == half ) # __eq__
         assert( not ( firstVal == secondVal ) ) # __ne__
         assert( not ( firstVal < secondVal ) ) # __lt__
         assert( secondVal < firstVal ) # __lt__
         assert( not ( firstVal <= secondVal ) ) # __le__
         assert( secondVal <= firstVal ) # __le__
-        assert( firstVal <= arithmetic.RationalNumber( 4, 3 ) ) # __le__
-        assert( secondVal <= arithmetic.RationalNumber( 1, 2 ) ) # __le__
+        assert( firstVal <= fourThirds ) # __le__
+        assert( secondVal <= half ) # __le__
         assert( not ( secondVal > firstVal ) ) # __gt__
         assert( firstVal > secondVal ) # __gt__
         assert( not ( secondVal >= firstVal ) ) # __gt__
         assert( firstVal >= secondVal ) # __gt__
-        assert( firstVal >= arithmetic.RationalNumber( 4, 3 ) ) # __ge__
-        assert( secondVal >= arithmetic.RationalNumber( 1, 2 ) ) # __ge__
+        assert( firstVal >= fourThirds ) # __ge__
+        assert( secondVal >= half ) # __ge__
         # test cmp
         assert( cmp( firstVal, secondVal ) > 0 )
         assert( cmp( secondVal, firstVal ) < 0 )
@@ -719,21 +817,21 @@ class TestArithmetic( unittest.TestCase ):
         # test against float
         secondVal = 0.5 # 1/2
         assert( firstVal != secondVal ) # __eq__
-        assert( firstVal == arithmetic.RationalNumber( 4, 3 ) ) # __eq__
-        assert( secondVal == arithmetic.RationalNumber( 1, 2 ) ) # __eq__
+        assert( firstVal == fourThirds ) # __eq__
+        assert( secondVal == half ) # __eq__
         assert( not ( firstVal == secondVal ) ) # __ne__
         assert( not ( firstVal < secondVal ) ) # __lt__
         assert( secondVal < firstVal ) # __lt__
         assert( not ( firstVal <= secondVal ) ) # __le__
         assert( secondVal <= firstVal ) # __le__
-        assert( firstVal <= arithmetic.RationalNumber( 4, 3 ) ) # __le__
-        assert( secondVal <= arithmetic.RationalNumber( 1, 2 ) ) # __le__
+        assert( firstVal <= fourThirds ) # __le__
+        assert( secondVal <= half ) # __le__
         assert( not ( secondVal > firstVal ) ) # __gt__
         assert( firstVal > secondVal ) # __gt__
         assert( not ( secondVal >= firstVal ) ) # __gt__
         assert( firstVal >= secondVal ) # __gt__
-        assert( firstVal >= arithmetic.RationalNumber( 4, 3 ) ) # __ge__
-        assert( secondVal >= arithmetic.RationalNumber( 1, 2 ) ) # __ge__
+        assert( firstVal >= fourThirds ) # __ge__
+        assert( secondVal >= half ) # __ge__
         # test cmp
         assert( cmp( firstVal, secondVal ) > 0 )
         assert( cmp( secondVal, firstVal ) < 0 )
@@ -742,21 +840,21 @@ class TestArithmetic( unittest.TestCase ):
         # test against long
         secondVal = 1L # 1/2
         assert( firstVal != secondVal ) # __eq__
-        assert( firstVal == arithmetic.RationalNumber( 4, 3 ) ) # __eq__
+        assert( firstVal == fourThirds ) # __eq__
         assert( secondVal == arithmetic.RationalNumber( 1, 1 ) ) # __eq__
         assert( not ( firstVal == secondVal ) ) # __ne__
         assert( not ( firstVal < secondVal ) ) # __lt__
         assert( secondVal < firstVal ) # __lt__
         assert( not ( firstVal <= secondVal ) ) # __le__
         assert( secondVal <= firstVal ) # __le__
-        assert( firstVal <= arithmetic.RationalNumber( 4, 3 ) ) # __le__
+        assert( firstVal <= fourThirds ) # __le__
         assert( secondVal <= 1L ) # __le__
         assert( not ( secondVal > firstVal ) ) # __gt__
         assert( firstVal > secondVal ) # __gt__
         assert( not ( secondVal >= firstVal ) ) # __gt__
         assert( firstVal >= secondVal ) # __gt__
-        assert( firstVal >= arithmetic.RationalNumber( 4, 3 ) ) # __ge__
-        assert( secondVal >= arithmetic.RationalNumber( 1, 2 ) ) # __ge__
+        assert( firstVal >= fourThirds ) # __ge__
+        assert( secondVal >= half ) # __ge__
         # test cmp
         assert( cmp( firstVal, secondVal ) > 0 )
         assert( cmp( secondVal, firstVal ) < 0 )
@@ -771,38 +869,39 @@ class TestArithmetic( unittest.TestCase ):
                          because the functions tested here rely on them.
               @param self
         """
-        assert( abs( 2.0 + arithmetic.RationalNumber( 1, 2 ) - 5.0/2.0 ) 
+        half = arithmetic.RationalNumber( 1, 2 )
+        assert( abs( 2.0 + half - 5.0/2.0 ) 
                 < 1e-5 )
-        assert( 2 + arithmetic.RationalNumber( 1, 2 ) == 
+        assert( 2 + half == 
                 arithmetic.RationalNumber( 5, 2 ) )
-        assert( 2L + arithmetic.RationalNumber( 1, 2 ) == 
+        assert( 2L + half == 
                 arithmetic.RationalNumber( 5, 2 ) )
-        assert( abs( complex( 2, 1 ) + arithmetic.RationalNumber( 1, 2 ) - 
+        assert( abs( complex( 2, 1 ) + half - 
                 complex( 5.0/2.0, 1 ) ) < 1e-5 )
         
-        assert( abs( 2.0 - arithmetic.RationalNumber( 1, 2 ) - 3.0/2.0 ) 
+        assert( abs( 2.0 - half - 3.0/2.0 ) 
                 < 1e-5 )
-        assert( 2 - arithmetic.RationalNumber( 1, 2 ) == 
+        assert( 2 - half == 
                 arithmetic.RationalNumber( 3, 2 ) )
-        assert( 2L - arithmetic.RationalNumber( 1, 2 ) == 
+        assert( 2L - half == 
                 arithmetic.RationalNumber( 3, 2 ) )
-        assert( abs( complex( 2, 1 ) - arithmetic.RationalNumber( 1, 2 ) - 
+        assert( abs( complex( 2, 1 ) - half - 
                 complex( 3.0/2.0, 1 ) ) < 1e-5 )
         
-        assert( abs( 2.0 * arithmetic.RationalNumber( 1, 2 ) - 1.0 ) < 1e-5 )
-        assert( 2 * arithmetic.RationalNumber( 1, 2 ) == 
+        assert( abs( 2.0 * half - 1.0 ) < 1e-5 )
+        assert( 2 * half == 
                 arithmetic.RationalNumber( 1, 1 ) )
-        assert( 2L * arithmetic.RationalNumber( 1, 2 ) == 
+        assert( 2L * half == 
                 arithmetic.RationalNumber( 1, 1 ) )
-        assert( abs( complex( 2, 1 ) * arithmetic.RationalNumber( 1, 2 ) - 
+        assert( abs( complex( 2, 1 ) * half - 
                 complex( 1.0, 0.5 ) ) < 1e-5 )
         
-        assert( abs( 2.0 / arithmetic.RationalNumber( 1, 2 ) - 4.0 ) < 1e-5 )
-        assert( 2 / arithmetic.RationalNumber( 1, 2 ) == 
+        assert( abs( 2.0 / half - 4.0 ) < 1e-5 )
+        assert( 2 / half == 
                 arithmetic.RationalNumber( 4, 1 ) )
-        assert( 2L / arithmetic.RationalNumber( 1, 2 ) == 
+        assert( 2L / half == 
                 arithmetic.RationalNumber( 4, 1 ) )
-        assert( abs( complex( 2, 1 ) / arithmetic.RationalNumber( 1, 2 ) - 
+        assert( abs( complex( 2, 1 ) / half - 
                 complex( 4, 2 ) ) < 1e-5 )
         
     def test_value_of( self ):
@@ -1009,8 +1108,42 @@ class TestOperators( unittest.TestCase ):
         assert( abs( exp10.convert( 2 ) * 
                 exp10.convert( 3 )-exp10.convert( 2+3 ) ) < 1e-5 )
         assert( not exp10.is_linear() )
-        # Test serialization
-        log10copy = operators.LogOperator( base )
+        # scalars are converted to the same type as by numpy
+        assert( isinstance( log10.convert( 20 ), numpy.float64 ) )
+        assert( isinstance( exp10.convert( 2 ), numpy.float64 ) )
+        # arrays are converted element-wise
+        values = numpy.array( [1.0, 10.0, 100.0] )
+        result = log10.convert( values )
+        assert( isinstance( result, numpy.ndarray ) )
+        assert( numpy.all( abs( result - [0.0, 1.0, 2.0] ) < 1e-5 ) )
+        assert( numpy.all( abs( exp10.convert( result ) - values ) < 1e-5 ) )
+        # the result can be written to a given array
+        buffer = numpy.empty( 3 )
+        assert( log10.convert( values, buffer ) is buffer )
+        assert( numpy.all( abs( buffer - [0.0, 1.0, 2.0] ) < 1e-5 ) )
+        assert( exp10.convert( buffer, buffer ) is buffer )
+        assert( numpy.all( abs( buffer - values ) < 1e-5 ) )
+        assert( numpy.all( values == [1.0, 10.0, 100.0] ) )
+        # values outside of the domain behave like numpy
+        errstate = numpy.seterr( all="ignore" )
+        try:
+            assert( log10.convert( 0 ) == -numpy.inf )
+            assert( numpy.isnan( log10.convert( -1 ) ) )
+            assert( exp10.convert( 1000 ) == numpy.inf )
+            assert( exp10.convert( -1000 ) == 0.0 )
+            # same for compiled compound operators
+            compound = operators.MultiplyOperator( 2 ) * log10
+            assert( compound.convert( 0 ) == -numpy.inf )
+            assert( numpy.isnan( compound.convert( -1 ) ) )
+            compound = exp10 * operators.MultiplyOperator( 2 )
+            assert( compound.convert( 1000 ) == numpy.inf )
+        finally:
+            numpy.seterr( **errstate )
+        # equal operators are created only once
+        assert( operators.LogOperator( base ) is log10 )
+        assert( ~log10 is exp10 )
+        # Test serialization (the long argument creates another instance)
+        log10copy = operators.LogOperator( long( base ) )
         sanityOp  = operators.AddOperator( 10 )
         test_serialization( log10, log10copy, sanityOp, 
                                          operators.LogOperator )
@@ -1040,11 +1173,35 @@ class TestOperators( unittest.TestCase ):
         assert( add.convert( 10 ) == 20 )
         min = ~add
         assert( min.convert( 10 ) == 0 )
-        # test serialization
-        copy = operators.AddOperator( 10 )
+        # equal operators are created only once
+        assert( operators.AddOperator( 10 ) is add )
+        assert( operators.AddOperator( 10.0 ) is not add )
+        assert( str( add ) == "+10" and str( min ) == "-10" )
+        # arrays are converted in place if a buffer is given
+        values = numpy.array( [1.0, 2.0] )
+        buffer = numpy.empty( 2 )
+        assert( add.convert( values, buffer ) is buffer )
+        assert( numpy.all( buffer == [11.0, 12.0] ) )
+        assert( numpy.all( add.convert( values ) == [11.0, 12.0] ) )
+        assert( numpy.all( values == [1.0, 2.0] ) )
+        assert( str( operators.AddOperator( 
+                     arithmetic.RationalNumber( -1, 2 ) ) ) == "-(1/2)" )
+        # operators have no instance dictionary
+        assert( not hasattr( add, "__dict__" ) )
+        # test serialization (the long argument creates another instance)
+        copy = operators.AddOperator( 10L )
         sanity = operators.AddOperator( arithmetic.RationalNumber( 1, 4 ) )
         test_serialization( add, copy, sanity, 
                                          operators.AddOperator )
+        # zero offsets are false states, check them for all protocols
+        for offset in [0, 0.0, arithmetic.RationalNumber( 0 )]:
+            zero = operators.AddOperator( offset )
+            test_serialization( zero, operators.AddOperator( 0L ), add, 
+                                operators.AddOperator )
+            for i in range( 0, pickle.HIGHEST_PROTOCOL+1 ):
+                copy = pickle.loads( pickle.dumps( zero, i ) )
+                assert( copy.get_offset() == 0 )
+                assert( copy.convert( 3 ) == 3 )
     
     def test_multiply_operator( self ):
         """! @brief Test the unit multiply operator.
@@ -1067,12 +1224,101 @@ class TestOperators( unittest.TestCase ):
         assert( mul.convert( 10 ) == 100 )
         div = ~mul
         assert( div.convert( 10 ) == 1 )
-        
-        copy = operators.MultiplyOperator( 10 )
+        values = numpy.array( [1.0, 2.0] )
+        assert( mul.convert( values, values ) is values )
+        assert( numpy.all( values == [10.0, 20.0] ) )
+        # exact factors are applied to floating point arrays in-place
+        assert( div.convert( values, values ) is values )
+        assert( numpy.all( values == [1.0, 2.0] ) )
+        # equal operators are created only once
+        assert( operators.MultiplyOperator( 10 ) is mul )
+        assert( operators.MultiplyOperator( 
+                arithmetic.RationalNumber( 1, 10 ) ) is div )
+        # test serialization (the long argument creates another instance)
+        copy = operators.MultiplyOperator( 10L )
         sanity = operators.MultiplyOperator( 
                            arithmetic.RationalNumber( 1, 4 ) )
         test_serialization( mul, copy, sanity, 
                                          operators.MultiplyOperator )
+        # zero factors are false states, check them for all protocols
+        for factor in [0, 0.0, arithmetic.RationalNumber( 0 )]:
+            zero = operators.MultiplyOperator( factor )
+            test_serialization( zero, operators.MultiplyOperator( 0L ), mul,
+                                operators.MultiplyOperator )
+            for i in range( 0, pickle.HIGHEST_PROTOCOL+1 ):
+                copy = pickle.loads( pickle.dumps( zero, i ) )
+                assert( copy.get_factor() == 0 )
+                assert( copy.convert( 3 ) == 0 )
+    
+    def test_affine_operator( self ):
+        """! @brief Test the unit affine operator.
+              @param self
+        """
+        affine = operators.AffineOperator( arithmetic.RationalNumber( 1, 2 ),
+                                           3 )
+        assert( not affine.is_linear() )
+        result = affine.convert( 10 )
+        # This operator should preserve the type
+        assert( isinstance( result, arithmetic.RationalNumber ) )
+        assert( result == arithmetic.RationalNumber( 8, 1 ) )
+        inverse = ~affine
+        assert( inverse.get_factor() == 2 )
+        assert( inverse.get_offset() == -6 )
+        assert( inverse.convert( 8 ) == 10 )
+        assert( str( affine ) == "+3(*(1/2))" )
+        # fusing the operators of a sequence
+        mul = operators.MultiplyOperator( 2 )
+        add = operators.AddOperator( 3 )
+        assert( operators.AffineOperator.fuse( [add, mul] ) == 
+                operators.AffineOperator( 2, 6 ) )
+        assert( operators.AffineOperator.fuse( [mul, add, mul] ) ==
+                operators.AffineOperator( 4, 6 ) )
+        assert( operators.AffineOperator( 2, 0 ).is_linear() )
+        values = numpy.array( [1.0, 2.0] )
+        assert( numpy.all( operators.AffineOperator( 2, 0.5 ).convert( 
+                           values ) == [2.5, 4.5] ) )
+        # test serialization (the long argument creates another instance)
+        copy = operators.AffineOperator( arithmetic.RationalNumber( 1, 2 ), 
+                                         3L )
+        test_serialization( affine, copy, inverse, 
+                                         operators.AffineOperator )
+    
+    def test_earlier_serialization( self ):
+        """! @brief Test loading operators pickled by an earlier version of
+              this module, when operators were classic classes having
+              single values as state.
+              @param self
+        """
+        pickles = [
+"(lp0\n(iquantities\nQuantity\np1\n((iunits\nTransformedUnit\np3\n((iunits\n"
+"BaseUnit\np4\nS'm'\np5\nb(ioperators\nMultiplyOperator\np6\nI1000\nbtp7\n"
+"bF3.0\ntp8\nba(ioperators\nAddOperator\np9\nI0\nba(ioperators\nLogOperator\n"
+"p10\nI10\nba(ioperators\nIdentity\np11\nI1\nba(ioperators\nCompoundOperator\n"
+"p12\n((ioperators\nMultiplyOperator\np13\nI2\nb(ioperators\nAddOperator\n"
+"p14\n(iarithmetic\nRationalNumber\np15\n(L1L\nL2L\ntp16\nbbtp17\nba.",
+"\x80\x02]q\x00((cquantities\nQuantity\nq\x01oq\x02(cunits\nTransformedUnit\n"
+"q\x04oq\x05(cunits\nBaseUnit\nq\x06oq\x07U\x01mq\x08b(coperators\n"
+"MultiplyOperator\nq\toq\nM\xe8\x03b\x86q\x0bbG@\x08\x00\x00\x00\x00\x00\x00"
+"\x86q\x0cb(coperators\nAddOperator\nq\roq\x0eK\x00b(coperators\nLogOperator\n"
+"q\x0foq\x10K\nb(coperators\nIdentity\nq\x11oq\x12K\x01b(coperators\n"
+"CompoundOperator\nq\x13oq\x14(h\toq\x15K\x02b(h\roq\x16(carithmetic\n"
+"RationalNumber\nq\x17oq\x18\x8a\x01\x01\x8a\x01\x02\x86q\x19bb\x86q\x1abe." ]
+        for string in pickles:
+            quantity, add, log, identity, compound = pickle.loads( string )
+            assert( quantity.get_default_unit() == si.METER * 1000 )
+            quantities.set_strict( False )
+            assert( quantity.get_value( si.METER ) == 3000.0 )
+            quantities.set_strict( True )
+            assert( add == operators.AddOperator( 0 ) )
+            assert( add.convert( 3 ) == 3 )
+            assert( log == operators.LogOperator( 10 ) )
+            assert( abs( log.convert( 100 ) - 2.0 ) < 1e-5 )
+            assert( identity == operators.IDENTITY )
+            assert( compound == operators.CompoundOperator( 
+                    operators.MultiplyOperator( 2 ), 
+                    operators.AddOperator( 
+                        arithmetic.RationalNumber( 1, 2 ) ) ) )
+            assert( compound.convert( 1 ) == arithmetic.RationalNumber( 5, 2 ) )
     
     def test_identity( self ):
         """! @brief Test the global identity variable (for unit converters).
@@ -1104,12 +1350,18 @@ class TestOperators( unittest.TestCase ):
         assert( mulInt*~mulInt == operators.IDENTITY )
         assert( mulInt*~mulRat == operators.IDENTITY )
         assert( mulFlt*~mulInt != operators.IDENTITY )
+        # plain integers cancel out without conversion, floats never
+        assert( addInt*operators.AddOperator( -10L ) == operators.IDENTITY )
+        assert( addFlt*~addFlt != operators.IDENTITY )
+        mulNeg = operators.MultiplyOperator( -1 )
+        assert( mulNeg*mulNeg == operators.IDENTITY )
         
         # test concatenation with IDENTITY
         # right multiplication
         assert( addInt * operators.IDENTITY == addInt )
         # left multiplication
-        assert( operators.IDENTITY * addInt == addInt )
+        assert( operators.IDENTITY * addInt is addInt )
+        assert( addInt * operators.Identity() is addInt )
         # test serialization
         copy = operators.Identity()
         sanity = operators.MultiplyOperator( 
@@ -1385,7 +1637,81 @@ class TestOperators( unittest.TestCase ):
                                     arithmetic.RationalNumber( 2, 1 ), 
                                     200, float, 1e-5 )
         # assertions for complex don't need to be tested anymore
-        
+
+        # Test the conversion of arrays
+        values = numpy.array( [10.0, 20.0, 200.0] )
+        for op in [mulAdd, addMul, logAdd, addLog, mulLog, logMul, logLog,
+                   invMulAdd, invLogAdd, invAddLog, invLogMul]:
+            result = op.convert_array( values )
+            assert( isinstance( result, numpy.ndarray ) )
+            assert( result.dtype == float )
+            for i in range( 0, len( values ) ):
+                assert( abs( result[i] - op.convert( values[i] ) ) < 1e-5 )
+        # arrays passed to convert are converted by the operators
+        logFltAdd = logOp * operators.MultiplyOperator( 0.5 ) * addOp
+        buffer = numpy.empty( 3 )
+        for op in [logFltAdd, ~logFltAdd]:
+            result = op.convert( values, buffer )
+            for i in range( 0, len( values ) ):
+                assert( abs( result[i] - op.convert( values[i] ) ) < 1e-5 )
+        # the argument must not be modified
+        assert( numpy.all( values == [10.0, 20.0, 200.0] ) )
+
+        # Test chains of compound operators
+        logMulAdd = logOp * mulAdd
+        TestOperators.TEST_CONV_APPX( logMulAdd, 10, 0.8822398480, float,
+                                    1e-5 )
+        TestOperators.TEST_CONV_APPX( ~logMulAdd, 0.8822398480, 10, float,
+                                    1e-5 )
+        assert( logMulAdd == ( logOp * mulOp ) * addOp )
+        assert( str( logMulAdd ) == "+5.25(*(1/2)(_10))" )
+        assert( str( logMulAdd ) is str( logMulAdd ) )
+        assert( isinstance( ~logMulAdd, operators.CompoundOperator ) )
+        assert( ~~logMulAdd == logMulAdd )
+        assert( str( ~logMulAdd ) == "^10(*2(-5.25))" )
+        assert( repr( logMulAdd ) == 
+                "<CompoundOperator +5.25(*(1/2)(_10))>" )
+        test_serialization( logMulAdd, ( logOp * mulOp ) * addOp, mulAdd,
+                            operators.CompoundOperator )
+        # the states of all operators are tuples
+        for op in [logMulAdd, logOp, ~logOp, addOp, mulOp, mulAdd,
+                   operators.IDENTITY]:
+            assert( isinstance( op.__getstate__(), tuple ) )
+
+        # Test hashing of operators
+        ops = { addOp: 1, mulOp: 2, logOp: 3, mulAdd: 4 }
+        assert( ops[operators.AddOperator( 5.25 )] == 1 )
+        assert( ops[operators.MultiplyOperator( 
+                    arithmetic.RationalNumber( 2, 4 ) )] == 2 )
+        assert( ops[operators.LogOperator( 10L )] == 3 )
+        assert( ops[mulOp * addOp] == 4 )
+        assert( ops.get( addMul ) is None )
+
+        # Test the simplification of compositions
+        assert( logOp * ~logOp == operators.IDENTITY )
+        assert( ~logOp * logOp == operators.IDENTITY )
+        addRat = operators.AddOperator( arithmetic.RationalNumber( 21, 4 ) )
+        mulAddRat = mulOp * addRat
+        assert( mulAddRat * ~addRat == mulOp )
+        assert( ~mulAddRat * mulAddRat == operators.IDENTITY )
+        # sequences of offsets and factors are evaluated exactly
+        mulAddMul = mulOp * addRat * mulOp
+        TestOperators.TEST_CONV( mulAddMul, 10, 
+                                arithmetic.RationalNumber( 41, 8 ), 
+                                arithmetic.RationalNumber )
+        TestOperators.TEST_CONV( ~mulAddMul, 
+                                arithmetic.RationalNumber( 41, 8 ), 
+                                arithmetic.RationalNumber( 10, 1 ), 
+                                arithmetic.RationalNumber )
+        assert( len( mulAddMul.get_operators() ) == 3 )
+        # floating point offsets are merged, but never cancelled
+        assert( len( ( mulAdd * ~addOp ).get_operators() ) == 2 )
+        assert( ~( logOp * mulAddRat ) * ( logOp * mulAddRat ) == 
+                operators.IDENTITY )
+        assert( isinstance( mulAdd * addOp, operators.CompoundOperator ) )
+        assert( len( ( mulAdd * addOp ).get_operators() ) == 2 )
+        TestOperators.TEST_CONV_APPX( mulAdd * addOp, 10, 10.25, float, 1e-5 )
+
         # Test Serialization
         copy = mulOp * addOp
         sanity = operators.MultiplyOperator( 
@@ -1393,6 +1719,70 @@ class TestOperators( unittest.TestCase ):
         test_serialization( mulAdd, copy, logAdd, 
                                          operators.CompoundOperator )
         
+class TestExceptions( unittest.TestCase ):
+    """! @brief       This class provides the test cases for the exceptions.
+    """
+    
+    def test_unit_exceptions( self ):
+        """! @brief Test the exceptions that refer to a unit.
+              @param self
+        """
+        for type in [qexceptions.UnitExistsException,
+                     qexceptions.ConversionException,
+                     qexceptions.NotDimensionlessException,
+                     qexceptions.UnknownUnitException]:
+            error = type( si.METER, "Some message" )
+            assert( isinstance( error, qexceptions.QuantitiesException ) )
+            # the exceptions share their methods
+            assert( type.__str__.im_func is 
+                    qexceptions.ConversionException.__str__.im_func )
+            assert( str( error ) == "Some message :m" )
+            # the string is only built once
+            assert( str( error ) is str( error ) )
+            # the unit is the first argument
+            assert( error.args == ( si.METER, "Some message" ) )
+            assert( error.__unit__ is si.METER )
+            copy = pickle.loads( pickle.dumps( error, 
+                                               pickle.HIGHEST_PROTOCOL ) )
+            assert( isinstance( copy, type ) )
+            assert( str( copy ) == "Some message :m" )
+        assert( str( qexceptions.ConversionException( si.METER ) ) == " :m" )
+        # templates are formatted when the exception is displayed
+        error = qexceptions.ConversionException( si.METER, "Not %s or %s",
+                                                 si.SECOND, si.AMPERE )
+        assert( error.args == ( si.METER, "Not %s or %s", si.SECOND, 
+                                si.AMPERE ) )
+        assert( str( error ) == "Not s or A :m" )
+        # further arguments that are no template values are displayed
+        error = qexceptions.ConversionException( si.METER, "a", "b" )
+        assert( str( error ) == "('a', 'b') :m" )
+        error = qexceptions.ConversionException( si.METER, "%d", "b" )
+        assert( str( error ) == "('%d', 'b') :m" )
+    
+    def test_sentinels( self ):
+        """! @brief Test the sentinels returned instead of exceptions.
+              @param self
+        """
+        assert( si.METER.get_operator_to( si.SECOND, 
+                                          qexceptions.CONVERSION_FAILED ) 
+                is qexceptions.CONVERSION_FAILED )
+        error = 0
+        try:
+            si.METER.get_operator_to( si.SECOND )
+        except qexceptions.ConversionException:
+            error = 1
+        assert( error )
+        model = units.get_default_model()
+        assert( model.get_dimension( si.METER ) == units.LENGTH )
+        assert( model.get_dimension( si.NEWTON, qexceptions.UNKNOWN_UNIT ) 
+                is qexceptions.UNKNOWN_UNIT )
+        error = 0
+        try:
+            model.get_dimension( si.NEWTON )
+        except qexceptions.UnknownUnitException:
+            error = 1
+        assert( error )
+        
 class TestQuantity( unittest.TestCase ):
     """! @brief       This class provides the test cases for the quantities.
     """
@@ -1443,6 +1833,15 @@ class TestQuantity( unittest.TestCase ):
         quantity = quantities.Quantity.value_of( 10 )
         assert( quantity.get_default_unit() == units.ONE )
         assert( quantity.get_value( units.ONE ) == 10 )
+        # small integers share their rational numbers
+        assert( quantity.get_value( units.ONE ) is 
+                quantities.Quantity.value_of( 10 ).get_value( units.ONE ) )
+        assert( quantities.Quantity.value_of( 256L ).get_value( units.ONE ) 
+                == 256 )
+        assert( quantities.Quantity.value_of( -5 ).get_value( units.ONE ) 
+                == -5 )
+        assert( quantities.Quantity.value_of( 1000 ).get_value( units.ONE ) 
+                == 1000 )
         assert( quantity.is_dimensionless() )
         
         # check serializablility
@@ -1450,11 +1849,52 @@ class TestQuantity( unittest.TestCase ):
         test_serialization( self.newtons1, newtons1copy, self.incompat, 
                            quantities.Quantity )
         
+        # quantities hold their unit and value only
+        quantity = quantities.Quantity( si.NEWTON, 10 )
+        names    = [ "__unit__", "__value__" ]
+        assert( sorted( vars( quantity ).keys() ) == names )
+        assert( sorted( vars( quantity * quantity ).keys() ) == names )
+        assert( sorted( vars( numpy.sqrt( quantity ) ).keys() ) == names )
+        
+        # units shared by quantities are pickled once
+        unit = si.NEWTON / si.SECOND
+        values = [ quantities.Quantity( unit, float( i ) ) 
+                   for i in range( 10 ) ]
+        copies = pickle.loads( pickle.dumps( values, 
+                                             pickle.HIGHEST_PROTOCOL ) )
+        assert( copies[0].get_default_unit() == unit )
+        assert( copies[0].get_default_unit() is copies[9].get_default_unit() )
+        assert( copies[9].get_value( unit ) == 9.0 )
+        
         # check is_dimensionless
         quantity = quantities.Quantity( si.RADIAN, 10 )
         assert( quantity.is_dimensionless() )
         quantity = quantities.Quantity( si.STERADIAN, 10 )
         assert( quantity.is_dimensionless() )
+        # the check depends on the physical model
+        class NoDimensionsModel( units.PhysicalModel ):
+            def __init__( self ):
+                pass
+            def get_dimension( self, unit, default=None ):
+                return units.NONE
+        quantity = quantities.Quantity( si.METER, 10 )
+        assert( not quantity.is_dimensionless() )
+        model = units.get_default_model()
+        units.set_default_model( NoDimensionsModel() )
+        try:
+            assert( quantity.is_dimensionless() )
+        finally:
+            units.set_default_model( model )
+        assert( not quantity.is_dimensionless() )
+        
+        # repeated conversions reuse the operator of the units
+        quantities.set_strict(False)
+        quantity = quantities.Quantity( si.METER, 2 )
+        milli = si.METER / 1000
+        assert( quantity.get_value( milli ) == 2000 )
+        assert( quantity.get_value( milli ) == 2000 )
+        assert( quantity.get_value( si.METER / 100 ) == 200 )
+        quantities.set_strict(True)
         
 
     def test_add( self ):       
@@ -1490,6 +1930,18 @@ class TestQuantity( unittest.TestCase ):
         assert( abs( result.get_value( si.KILOGRAM * si.METER / 
                 ( si.SECOND **2 ) ) 
                 - 7.0 ) < 1e-5 )
+        
+        # arrays in different units
+        values = numpy.array( [1.0, 2.0] )
+        meters = quantities.Quantity( si.METER, values )
+        millimeters = quantities.Quantity( si.METER / 1000, values )
+        result = meters + millimeters
+        assert( numpy.all( abs( result.get_value( si.METER ) - 
+                                [1.001, 2.002] ) < 1e-9 ) )
+        result = millimeters + meters
+        assert( numpy.all( result.get_value( si.METER / 1000 ) == 
+                           [1001.0, 2002.0] ) )
+        assert( numpy.all( values == [1.0, 2.0] ) )
         quantities.set_strict(True)
         
         # check with numeric arguments
@@ -1576,6 +2028,14 @@ class TestQuantity( unittest.TestCase ):
         assert( result.get_default_unit() == si.NEWTON ) 
         assert( result.get_value( si.NEWTON ) == 20 )
         
+        # the products of the same units are reused
+        result = self.newtons1 * self.newtons2
+        other  = self.newtons2 * self.newtons1
+        assert( result.get_default_unit() is other.get_default_unit() )
+        result = self.newtons1 / self.other
+        other  = self.newtons2 / self.other
+        assert( result.get_default_unit() is other.get_default_unit() )
+        
     def test_pow( self ):
         """! @brief Test powers of quantities.
               @param self
@@ -1648,6 +2108,34 @@ class TestQuantity( unittest.TestCase ):
         assert( result.get_default_unit() == si.NEWTON )
         assert( abs( result.get_value( si.NEWTON ) - numpy.sqrt(13.0) ) 
                 < 10e-6 )
+        
+        # arrays
+        result = quantities.Quantity( si.NEWTON, numpy.array( [3.0, 5.0] ) )
+        result = numpy.hypot( result, 
+                   quantities.Quantity( si.NEWTON, numpy.array( [4.0, 12.0] ) ) )
+        assert( result.get_default_unit() == si.NEWTON )
+        assert( numpy.all( abs( result.get_value( si.NEWTON ) - 
+                                [5.0, 13.0] ) < 1e-9 ) )
+        
+        # arrays of different units
+        quantities.set_strict(False)
+        values = numpy.array( [4.0, 12.0] )
+        other  = quantities.Quantity( si.NEWTON / 1000, values * 1000 )
+        result = quantities.Quantity( si.NEWTON, numpy.array( [3.0, 5.0] ) )
+        result = numpy.hypot( result, other )
+        assert( result.get_default_unit() == si.NEWTON )
+        assert( numpy.all( abs( result.get_value( si.NEWTON ) - 
+                                [5.0, 13.0] ) < 1e-9 ) )
+        assert( numpy.all( other.get_value( si.NEWTON / 1000 ) == 
+                           values * 1000 ) )
+        quantities.set_strict(True)
+        
+        error = 0
+        try:
+            numpy.hypot( self.newtons1, self.incompat )
+        except qexceptions.ConversionException:
+            error = 1
+        assert( error )
 
         
     def test_div( self ):
@@ -2470,6 +2958,16 @@ class TestQuantity( unittest.TestCase ):
         value = result.get_value( unit )
         assert( value == numpy.log10( 0.9 ) )
         
+        # outside of the domain the result of numpy is kept
+        olderr = numpy.seterr( invalid='ignore', divide='ignore' )
+        try:
+            value = numpy.log10( quantities.Quantity( units.ONE, -1.0 ) )
+            assert( numpy.isnan( value.get_value( units.ONE ) ) )
+            value = numpy.log10( quantities.Quantity( units.ONE, 0.0 ) )
+            assert( numpy.isinf( value.get_value( units.ONE ) ) )
+        finally:
+            numpy.seterr( **olderr )
+        
         # test quantities broadcast
         result = numpy.log10( quvalue )
         assert( isinstance( result, quantities.Quantity ) )
@@ -2539,6 +3037,19 @@ class TestQuantity( unittest.TestCase ):
         assert( unit == units.ONE )
         value = result.get_value( unit )
         assert( value == numpy.sin( 0.9 ) )
+        # the scalar result has the same type and display as for numpy
+        assert( isinstance( value, numpy.float64 ) )
+        assert( str( result ) == str( quantities.Quantity( units.ONE, 
+                                                numpy.sin( 0.9 ) ) ) )
+        
+        # arrays are passed to numpy at once
+        values = numpy.array( [0.0, 0.9] )
+        result = numpy.sin( quantities.Quantity( si.RADIAN, values ) )
+        assert( isinstance( result, quantities.Quantity ) )
+        value = result.get_value( units.ONE )
+        assert( isinstance( value, numpy.ndarray ) )
+        assert( value.dtype == numpy.float64 )
+        assert( numpy.all( value == numpy.sin( values ) ) )
         
         # test quantities broadcast
         result = numpy.sin( quvalue )
@@ -2624,6 +3135,20 @@ class TestQuantity( unittest.TestCase ):
         assert( unit == si.METER )
         value = result.get_value( unit )
         assert( value == numpy.sqrt( 0.9 ) )
+        # the square root of the unit is reused
+        assert( numpy.sqrt( qivalue ).get_default_unit() is unit )
+        
+        # store the result in a given quantity
+        quantity = quantities.Quantity( si.METER**2, numpy.array( [4.0, 9.0] ) )
+        values   = quantity.get_value( si.METER**2 )
+        result   = quantity.sqrt( out=quantity )
+        assert( result is quantity )
+        assert( result.get_default_unit() == si.METER )
+        # the square root of the unit is reused
+        assert( numpy.sqrt( qivalue ).get_default_unit() is 
+                numpy.sqrt( qivalue ).get_default_unit() )
+        assert( result.get_value( si.METER ) is values )
+        assert( numpy.all( values == [2.0, 3.0] ) )
         
     def test_square( self ):
         """! @brief Test the operator numpy.square on quantities.
@@ -2659,6 +3184,8 @@ class TestQuantity( unittest.TestCase ):
         assert( unit == si.METER ** 4 )
         value = result.get_value( unit )
         assert( value == numpy.square( 0.9 ) )
+        # the square of the unit is reused
+        assert( numpy.square( qivalue ).get_default_unit() is unit )
     
     def test_absolute( self ):
         """! @brief Test the operator numpy.absolute on quantities.
@@ -2729,6 +3256,17 @@ class TestQuantity( unittest.TestCase ):
         assert( unit == si.METER**2 )
         value = result.get_value( unit )
         assert( value == numpy.fabs( 0.9 ) )
+        
+        # store the result in a given quantity
+        quantity = quantities.Quantity( si.METER, numpy.array( [-1.0, 2.0] ) )
+        other    = quantities.Quantity( si.SECOND, numpy.zeros( 2 ) )
+        values   = other.get_value( si.SECOND )
+        result   = quantity.fabs( out=other )
+        assert( result is other )
+        assert( result.get_default_unit() == si.METER )
+        assert( result.get_value( si.METER ) is values )
+        assert( numpy.all( values == [1.0, 2.0] ) )
+        assert( numpy.all( quantity.get_value( si.METER ) == [-1.0, 2.0] ) )
     
     def test_floor( self ):
         """! @brief Test the operator numpy.floor on quantities.
@@ -3002,8 +3540,86 @@ class TestQuantity( unittest.TestCase ):
         assert( abs( value - complex( 0.5, 0 ) ) < 1e-5 )
         value = complex( q4 )
         assert( value == complex( 2, 1 ) )
+        
+        # arrays
+        values = numpy.array( [1.0, 2.0, 3.0] )
+        q5 = quantities.Quantity( si.METER, values )
+        assert( q5.as_ndarray( si.METER ) is values )
+        result = q5.as_ndarray( si.METER / 1000 )
+        assert( numpy.all( result == [1000.0, 2000.0, 3000.0] ) )
+        assert( result.dtype == numpy.float64 )
+        assert( numpy.all( values == [1.0, 2.0, 3.0] ) )
+        result = numpy.asarray( q5, float )
+        assert( numpy.all( result == values ) )
+        result = quantities.Quantity( si.AMPERE, numpy.arange( 3 ) )
+        result = result.as_ndarray( si.AMPERE )
+        assert( result.dtype == numpy.float64 )
+        assert( numpy.asarray( q5 ).dtype == object )
+        assert( numpy.array( [q1, q2] ).dtype == object )
+        
+        # arrays defer operations to quantities holding arrays
+        result = values * q5
+        assert( isinstance( result, quantities.Quantity ) )
+        assert( numpy.all( result.get_value( si.METER ) == [1.0, 4.0, 9.0] ) )
+        result = values - quantities.Quantity( units.ONE, values )
+        assert( isinstance( result, quantities.Quantity ) )
+        assert( numpy.all( result.get_value( units.ONE ) == 0.0 ) )
+        result = values * q1
+        assert( result.dtype == object )
+        
+        # arrays of quantities
+        result = quantities.Quantity.array_of( [[q1, q2], [q3, q1]] )
+        assert( result.get_default_unit() == si.AMPERE )
+        assert( numpy.all( result.get_value( si.AMPERE ) == 
+                           [[10.0, 1.5], [0.5, 10.0]] ) )
+        result = quantities.Quantity.array_of( [q5, q5], si.METER / 100 )
+        assert( numpy.all( result.get_value( si.METER / 100 ) == 
+                           [values * 100, values * 100] ) )
+        # integers result in floating point arrays
+        result = quantities.Quantity.array_of( [quantities.Quantity( 
+                                                    si.METER, 1 ),
+                                                quantities.Quantity( 
+                                                    si.METER, 2 )] )
+        assert( result.get_value( si.METER ).dtype == numpy.float64 )
+        assert( numpy.all( result.get_value( si.METER ) == [1.0, 2.0] ) )
+        result = quantities.Quantity.array_of( [1, 2] )
+        assert( result.get_value( units.ONE ).dtype == numpy.float64 )
+        result = quantities.Quantity.array_of( [1+2j, 3] )
+        assert( result.get_value( units.ONE ).dtype == numpy.complex128 )
         quantities.set_strict(True)
         
+        # arrays of values
+        result = quantities.Quantity.from_array( si.METER, values )
+        assert( result.get_default_unit() == si.METER )
+        assert( result.get_value( si.METER ) is values )
+        result = quantities.Quantity.from_array( si.METER, [1.0, 2.0] )
+        assert( isinstance( result.get_value( si.METER ), numpy.ndarray ) )
+        assert( numpy.all( ( result * 2 ).get_value( si.METER ) == 
+                           [2.0, 4.0] ) )
+        
+        error = 0
+        try:
+            numpy.asarray( q5, float )
+        except qexceptions.ConversionException, exception:
+            error = 1
+            assert( exception.__unit__ is si.METER )
+        assert( error )
+        # dimensionless units other than ONE are accepted
+        result = numpy.asarray( quantities.Quantity( si.RADIAN, values ), 
+                                float )
+        assert( numpy.all( result == values ) )
+        # complex values are kept
+        complexValues = numpy.array( [1+2j, 3-1j] )
+        result = numpy.asarray( quantities.Quantity( units.ONE, 
+                                                     complexValues ), complex )
+        assert( numpy.all( result == complexValues ) )
+        result = quantities.Quantity( si.METER, complexValues )
+        quantities.set_strict( False )
+        result = result.as_ndarray( si.METER / 1000 )
+        quantities.set_strict( True )
+        assert( result.dtype == numpy.complex128 )
+        assert( numpy.all( result == complexValues * 1000 ) )
+        
     def test_comparisions( self ):
         """! @brief Test comparing quantities.
               @param self
@@ -3109,6 +3725,8 @@ class TestQuantity( unittest.TestCase ):
         assert( q1 <= q2 )
         assert( not ( q1 >= q2 ) )
         assert( cmp( q1, q2 ) < 0 )
+        assert( cmp( q2, q1 ) > 0 )
+        assert( cmp( q1, quantities.Quantity( si.NEWTON, 10.0 ) ) == 0 )
         quantities.set_strict(True)
         
         # trivial
@@ -3146,9 +3764,8 @@ class TestUncertaintyComponents( unittest.TestCase ):
         assert( component.__getstate__() != False )
         # serialize the object
         someString = pickle.dumps( component, protocol )
-        # is the result really a string?
-        assert( someString != None )
-        assert( len( someString ) > 0 )
+        # is the result really a non-empty string?
+        assert( someString )
         
         # dserialize the objects
         deserializedInstance = pickle.loads( someString )
@@ -5601,16 +6218,24 @@ class TestGUMTree( unittest.TestCase ):
                 < desired_err))
         
 # initialize tests
+# You may select tests by name, e.g. 
+# "python testcases.py TestArithmetic TestQuantity.test_add".
 if __name__ == '__main__':
-    suite = unittest.TestSuite()
-    suite.addTest( unittest.makeSuite( TestSIUnits ) )
-    suite.addTest( unittest.makeSuite( TestArithmetic ) )
-    suite.addTest( unittest.makeSuite( TestOperators ) )
-    suite.addTest( unittest.makeSuite( TestQuantity ) )
-    suite.addTest( unittest.makeSuite( TestUncertaintyComponents ) )
-    suite.addTest( unittest.makeSuite( TestGUMTree ) )
-    suite.addTest( unittest.makeSuite( 
-                   TestComplexUncertaintyComponents) )
-    unittest.TextTestRunner( verbosity=2 ).run( suite )
+    if( len( sys.argv ) > 1 ):
+        suite = unittest.defaultTestLoader.loadTestsFromNames( 
+                   sys.argv[1:], sys.modules[__name__] )
+    else:
+        suite = unittest.TestSuite()
+        suite.addTest( unittest.makeSuite( TestSIUnits ) )
+        suite.addTest( unittest.makeSuite( TestArithmetic ) )
+        suite.addTest( unittest.makeSuite( TestOperators ) )
+        suite.addTest( unittest.makeSuite( TestExceptions ) )
+        suite.addTest( unittest.makeSuite( TestQuantity ) )
+        suite.addTest( unittest.makeSuite( TestUncertaintyComponents ) )
+        suite.addTest( unittest.makeSuite( TestGUMTree ) )
+        suite.addTest( unittest.makeSuite( 
+                       TestComplexUncertaintyComponents) )
+    result = unittest.TextTestRunner( verbosity=2 ).run( suite )
+    sys.exit( not result.wasSuccessful() )
 
 ## @}
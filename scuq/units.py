@@ -42,6 +42,20 @@ def get_default_model():
        @see PhysicalModel.
     """
     return __UNITS_MANAGER__.get_model()
+
+## Function that is called before the first symbol, that is not
+#  plain ASCII, is displayed.
+_encoding_check = None
+
+def set_encoding_check( function ):
+    """! @brief       Set a function that checks the encoding of symbols.
+       The function is called once, before an alternate unit having a
+       symbol that is not plain ASCII is displayed for the first time.
+       @param function A function without arguments, or None.
+       @see si.check_encoding
+    """
+    global _encoding_check
+    _encoding_check = function
     
 class PhysicalModel:
     """! @brief       This class models the abstract interface for physical models.
@@ -57,11 +71,14 @@ class PhysicalModel:
         """
         raise NotImplementedError
 
-    def get_dimension( self, unit ):
+    def get_dimension( self, unit, default=None ):
         """! @brief Get the pysical dimension that corresponds to the
                given unit.
                @param self
                @param unit to check the dimension for.
+               @param default The value to return if the unit is unknown 
+                      (e.g. qexceptions.UNKNOWN_UNIT). By default an 
+                      exception is raised instead.
                @return The corresponding physical dimension.
         """
         raise NotImplementedError
@@ -270,7 +287,11 @@ class Unit:
       This class provides an interface to model physical units.
       @attention You have to use one of its silblings to get any effect.
     """
-
+    
+    ## The physical dimension of the unit and the model it was derived from.
+    # Units are immutable, so the dimension is only derived once per model.
+    # \see Unit.get_dimension
+    __dimension__ = None
 
     def __eq__( self, other ):
         """! @brief Check for if two units are equal.
@@ -312,25 +333,32 @@ class Unit:
                          silblings of Unit. You only have to override it if you are
                          directly inheriting from Unit.
         """
+        model  = __UNITS_MANAGER__.get_model()
+        cached = self.__dimension__
+        if( cached is not None and cached[0] is model ):
+            return cached[1]
+        
         sysUnit = self.get_system_unit()
         if( isinstance( sysUnit, BaseUnit ) ):
-            return __UNITS_MANAGER__.get_model().get_dimension( sysUnit )
-        if( isinstance( sysUnit, AlternateUnit ) or isinstance( sysUnit, 
+            dimension = model.get_dimension( sysUnit )
+        elif( isinstance( sysUnit, AlternateUnit ) or isinstance( sysUnit, 
                                                  TransformedUnit ) ):
-            return sysUnit.get_parent().get_dimension()
-        if( isinstance( sysUnit, CompoundUnit ) ):
-            return sysUnit.get_first().get_dimension()
-        # only product Unit left
-        assert( isinstance( sysUnit, ProductUnit ) )
-        
-        dimension = NONE
-        for i in range( 0, sysUnit.get_unitCount() ):
-            unit = sysUnit.get_unit( i )
-            dim  = ( unit.get_dimension() ** 
-                     sysUnit.get_unitPow( i ) ).root( 
-                     sysUnit.get_unitRoot( i ) )
-            dimension = dimension * dim
+            dimension = sysUnit.get_parent().get_dimension()
+        elif( isinstance( sysUnit, CompoundUnit ) ):
+            dimension = sysUnit.get_first().get_dimension()
+        else:
+            # only product Unit left
+            assert( isinstance( sysUnit, ProductUnit ) )
+            
+            dimension = NONE
+            for i in range( 0, sysUnit.get_unitCount() ):
+                unit = sysUnit.get_unit( i )
+                dim  = ( unit.get_dimension() ** 
+                         sysUnit.get_unitPow( i ) ).root( 
+                         sysUnit.get_unitRoot( i ) )
+                dimension = dimension * dim
         
+        self.__dimension__ = ( model, dimension )
         return dimension
             
     
@@ -414,7 +442,12 @@ class Unit:
             if( other == 1L ):
                 return self
             if( other > 0L ):
-                return self.__mul__( self.__pow__( other-1 ) )
+                # square the unit for each bit of the exponent
+                half   = self.__pow__( other // 2 )
+                result = half.__mul__( half )
+                if( other % 2 ):
+                    result = result.__mul__( self )
+                return result
             elif( other == 0L ):
                 return ONE
             else:
@@ -425,6 +458,8 @@ class Unit:
             root  = other.get_divisor()
             
             powered = self ** power
+            if( root == 1 ):
+                return powered
             rooted  = powered.root(root)
             return rooted
         
@@ -527,12 +562,16 @@ class Unit:
         """
         raise NotImplementedError
     
-    def get_operator_to( self, unit ):
+    def get_operator_to( self, unit, default=None ):
         """! @brief Convert units.
               This method returns an operator that converts values that have been
               formed with the current unit to another other unit.
               @param self
               @param unit The unit to convert to.
+              @param default The value to return if the units describe
+                     different physical dimensions (e.g. 
+                     qexceptions.CONVERSION_FAILED). By default an exception
+                     is raised instead.
               @return A converter to the argument.
               @exception qexceptions.ConversionException If a conversion is not 
                          possible an exception is raised (i.e. if the units describe
@@ -554,8 +593,10 @@ class Unit:
         selfDim = self.get_dimension()
         otherDim = unit.get_dimension()
         if( not otherDim == selfDim ):
+            if( default is not None ):
+                return default
             raise qexceptions.ConversionException( self, 
-                " has not the same physical dimension as "+str( unit ) )
+                " has not the same physical dimension as %s", unit )
         
         selfTransform  = self.to_system_unit() * selfUnit.__getTransformOf()
         otherTransform = unit.to_system_unit() * otherUnit.__getTransformOf()
@@ -590,8 +631,8 @@ class Unit:
             op   = unit.__getTransformOf()
             if( not op.is_linear() ):
                 raise qexceptions.ConversionException( unit, 
-                                 " has been created using non-linear operation"
-                                 + str( op ) )
+                                 " has been created using non-linear "
+                                 +"operation%s", op )
             if( self.get_unitRoot( i ) != 1 ):
                 raise qexceptions.ConversionException( unit, \
                                  " has has fractional exponent" )
@@ -784,8 +825,8 @@ class BaseUnit( Unit ):
         """
         self.__symbol__ = state
         if( not __UNITS_MANAGER__.existsUnit( self ) ):
-            raise UnknownUnitException( self, " is unknown, and can"
-                                           +" therefore not  be unpickled" )
+            raise qexceptions.UnknownUnitException( self, 
+                        " is unknown, and can therefore not  be unpickled" )
     
 
 class DerivedUnit( Unit ):
@@ -901,8 +942,14 @@ class AlternateUnit( DerivedUnit ):
               @param self
               @return A string describing this unit.
               @see AlternateUnit.get_symbol
+              @see set_encoding_check
         """
-        return self.get_symbol()
+        symbol = self.get_symbol()
+        if( _encoding_check is not None and max( symbol ) > "\x7f" ):
+            check = _encoding_check
+            set_encoding_check( None )
+            check()
+        return symbol
     
     def __getstate__( self ):
         """! @brief Serialization using pickle.
@@ -924,8 +971,8 @@ class AlternateUnit( DerivedUnit ):
         """
         self.__symbol__, self.__parentUnit__ = state
         if( not __UNITS_MANAGER__.existsUnit( self ) ):
-            raise UnknownUnitException( self, " is unknown, and can therefore"
-                                           +" not be unpickled" )
+            raise qexceptions.UnknownUnitException( self, 
+                        " is unknown, and can therefore not be unpickled" )
     
 # Example for AlternateUnit
 ## This example shows how to create and use instances of